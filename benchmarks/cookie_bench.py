@@ -0,0 +1,308 @@
+"""Benchmark cookie operations against synthetic profiles of increasing size.
+
+Realistic Chrome (``cookies``) and Firefox (``moz_cookies``) databases are
+generated under a throwaway home directory, then the same code paths the
+GUI and CLI use are timed on them:
+
+    count        get_cookie_count() on a cold cache
+    count_warm   get_cookie_count() answered from the stat-keyed cache
+    details      get_cookie_details()
+    clean        clean_cookies(), including the backup snapshot
+    verify       count_all_profiles() after cleaning
+
+Results are written as JSON so runs can be compared across commits:
+
+    python -m benchmarks.cookie_bench --rows 1000 100000 --output before.json
+    python -m benchmarks.cookie_bench --rows 1000 100000 --compare before.json
+
+The real home directory is never touched, but cleaning a Chrome profile
+force quits Chrome, so the benchmark refuses to run while a benchmarked
+browser is open.
+"""
+import argparse
+import configparser
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_ROWS = [1000, 10000, 100000]
+BROWSERS = ["chrome", "firefox"]
+
+# Seconds between 1601-01-01 and 1970-01-01, for Chrome timestamps
+WINDOWS_EPOCH_OFFSET = 11644473600
+
+CHROME_SCHEMA = """
+CREATE TABLE meta(key LONGVARCHAR NOT NULL UNIQUE PRIMARY KEY, value LONGVARCHAR);
+CREATE TABLE cookies(
+    creation_utc INTEGER NOT NULL, host_key TEXT NOT NULL, top_frame_site_key TEXT NOT NULL,
+    name TEXT NOT NULL, value TEXT NOT NULL, encrypted_value BLOB NOT NULL, path TEXT NOT NULL,
+    expires_utc INTEGER NOT NULL, is_secure INTEGER NOT NULL, is_httponly INTEGER NOT NULL,
+    last_access_utc INTEGER NOT NULL, has_expires INTEGER NOT NULL,
+    is_persistent INTEGER NOT NULL, priority INTEGER NOT NULL, samesite INTEGER NOT NULL,
+    source_scheme INTEGER NOT NULL, source_port INTEGER NOT NULL,
+    last_update_utc INTEGER NOT NULL, source_type INTEGER NOT NULL,
+    has_cross_site_ancestor INTEGER NOT NULL);
+CREATE UNIQUE INDEX cookies_unique_index ON cookies(host_key, top_frame_site_key,
+    has_cross_site_ancestor, name, path, source_scheme, source_port);
+INSERT INTO meta VALUES ('version', '23'), ('last_compatible_version', '23');
+"""
+
+FIREFOX_SCHEMA = """
+CREATE TABLE moz_cookies (
+    id INTEGER PRIMARY KEY, originAttributes TEXT NOT NULL DEFAULT '', name TEXT, value TEXT,
+    host TEXT, path TEXT, expiry INTEGER, lastAccessed INTEGER, creationTime INTEGER,
+    isSecure INTEGER, isHttpOnly INTEGER, inBrowserElement INTEGER DEFAULT 0,
+    sameSite INTEGER DEFAULT 0, rawSameSite INTEGER DEFAULT 0, schemeMap INTEGER DEFAULT 0,
+    isPartitionedAttributeSet INTEGER DEFAULT 0,
+    CONSTRAINT moz_uniqueid UNIQUE (name, host, path, originAttributes));
+"""
+
+TLDS = ["com", "org", "net", "de", "co.uk", "io", "fr", "com.au"]
+SUBDOMAINS = ["", "", "www.", "accounts.", "cdn.", "static.", "api."]
+COOKIE_NAMES = ["_ga", "_gid", "sid", "session", "consent", "pref", "csrftoken", "_fbp", "uid"]
+
+def _synthetic_cookies(rows: int, seed: int = 0):
+    """Yield (host, name, path, value, expiry_unix, created_unix) tuples.
+
+    Hosts follow a skewed distribution over roughly rows/20 sites, about
+    one in ten cookies has expired and one in ten is a session cookie
+    (expiry 0), which is close to what long-lived real profiles look like.
+    """
+    rng = random.Random(seed)
+    now = int(time.time())
+    sites = [f"site{i}.{rng.choice(TLDS)}" for i in range(max(50, rows // 20))]
+    for i in range(rows):
+        site = sites[min(len(sites) - 1, int(rng.paretovariate(1.2)) - 1)] \
+            if rng.random() < 0.3 else rng.choice(sites)
+        prefix = rng.choice(SUBDOMAINS)
+        host = f".{site}" if not prefix else prefix + site
+        name = f"{rng.choice(COOKIE_NAMES)}_{i}"
+        value = "%x" % rng.getrandbits(4 * rng.randint(8, 160))
+        roll = rng.random()
+        if roll < 0.1:
+            expiry = 0
+        elif roll < 0.2:
+            expiry = now - rng.randint(60, 365 * 86400)
+        else:
+            expiry = now + rng.randint(60, 400 * 86400)
+        yield host, name, "/", value, expiry, now - rng.randint(0, 365 * 86400)
+
+def _to_chrome_time(unix: int) -> int:
+    return (unix + WINDOWS_EPOCH_OFFSET) * 1000000
+
+def create_chrome_db(path: Path, rows: int, seed: int = 0) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path))
+    try:
+        conn.executescript(CHROME_SCHEMA)
+        conn.executemany(
+            "INSERT INTO cookies VALUES (?, ?, '', ?, '', ?, ?, ?, 1, 0, ?, ?, ?, 1, 0, 2, 443, ?, 0, 0)",
+            (
+                (_to_chrome_time(created), host, name, value.encode(), path_,
+                 _to_chrome_time(expiry) if expiry else 0, _to_chrome_time(created),
+                 int(expiry != 0), int(expiry != 0), _to_chrome_time(created))
+                for host, name, path_, value, expiry, created in _synthetic_cookies(rows, seed)
+            ),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+def create_firefox_db(path: Path, rows: int, seed: int = 0) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path))
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(FIREFOX_SCHEMA)
+        conn.executemany(
+            "INSERT INTO moz_cookies (name, value, host, path, expiry, lastAccessed, creationTime,"
+            " isSecure, isHttpOnly, sameSite, rawSameSite, schemeMap)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, 1, 0, 1, 1, 2)",
+            (
+                (name, value, host, path_, expiry, created * 1000000, created * 1000000)
+                for host, name, path_, value, expiry, created in _synthetic_cookies(rows, seed)
+            ),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+def create_profile(browser: str, home: Path, rows: int, seed: int = 0) -> Path:
+    """Lay out a default profile for browser under home; returns its cookie DB
+
+    Files go where the browser class looks for them on this platform.
+    """
+    from src.browsers import get_browser_class
+
+    root = get_browser_class(browser)(home=home).get_data_dir()
+    if root is None:
+        raise SystemExit(f"{browser} has no data folder on {sys.platform}")
+    if browser != "firefox":
+        cookie_path = root / "Default/Network/Cookies"
+        create_chrome_db(cookie_path, rows, seed)
+        with open(root / "Local State", "w", encoding="utf-8") as f:
+            json.dump({"profile": {"last_used": "Default",
+                                   "info_cache": {"Default": {"name": "Person 1"}}}}, f)
+        return cookie_path
+
+    cookie_path = root / "bench.default-release/cookies.sqlite"
+    create_firefox_db(cookie_path, rows, seed)
+    ini = configparser.ConfigParser()
+    ini["Profile0"] = {"Name": "default-release", "IsRelative": "1",
+                       "Path": "bench.default-release", "Default": "1"}
+    with open(root / "profiles.ini", "w", encoding="utf-8") as f:
+        ini.write(f, space_around_delimiters=False)
+    return cookie_path
+
+def _sqlite_files(cookie_path: Path) -> List[Path]:
+    return [cookie_path.with_name(cookie_path.name + suffix) for suffix in ("", "-wal", "-shm")]
+
+def copy_database(source_db: Path, target_db: Path) -> None:
+    """Replace target_db (and its -wal/-shm files) with a copy of source_db"""
+    for path in _sqlite_files(target_db):
+        path.unlink(missing_ok=True)
+    for source, target in zip(_sqlite_files(source_db), _sqlite_files(target_db)):
+        if source.exists():
+            shutil.copy2(source, target)
+
+def _time(func: Callable, repeat: int, setup: Optional[Callable] = None) -> Dict:
+    runs = []
+    result = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        result = func()
+        runs.append(time.perf_counter() - start)
+    return {
+        "runs": runs,
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "result": result if isinstance(result, (int, float, bool)) else None,
+    }
+
+def bench_browser(name: str, home: Path, rows: int, repeat: int) -> List[Dict]:
+    from src.browsers import get_browser_class
+    from src.utils.backup import BackupStore
+
+    cookie_path = create_profile(name, home, rows)
+    template = home / f"{name}.template.sqlite"
+    copy_database(cookie_path, template)
+    db_bytes = sum(p.stat().st_size for p in _sqlite_files(cookie_path) if p.exists())
+
+    store = BackupStore(root=home / "backups")
+    browser = get_browser_class(name)(backup_store=store, home=home)
+    if browser.get_cookie_path() != cookie_path:
+        raise RuntimeError(f"{name} did not resolve the benchmark profile at {cookie_path}")
+
+    reset = lambda: copy_database(template, cookie_path)
+    cold = lambda: (reset(), browser.invalidate_count())
+    phases = {
+        "count": _time(browser.get_cookie_count, repeat, setup=cold),
+        "count_warm": _time(browser.get_cookie_count, repeat),
+        "details": _time(lambda: len(browser.get_cookie_details()), repeat),
+        "clean": _time(lambda: browser.clean_cookies()[0], repeat, setup=reset),
+    }
+    phases["verify"] = _time(browser.count_all_profiles, repeat)
+
+    results = []
+    for op, timing in phases.items():
+        results.append({"browser": name, "rows": rows, "db_bytes": db_bytes, "op": op, **timing})
+    return results
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True, cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _key(result: Dict) -> tuple:
+    return result["browser"], result["rows"], result["op"]
+
+def print_table(results: List[Dict], baseline: Optional[Dict] = None) -> None:
+    previous = {_key(r): r for r in (baseline or {}).get("results", [])}
+    header = f"{'browser':<8} {'rows':>9} {'op':<11} {'min ms':>10} {'median ms':>10}"
+    print(header + ("  vs baseline" if previous else ""), file=sys.stderr)
+    for r in results:
+        line = f"{r['browser']:<8} {r['rows']:>9} {r['op']:<11} " \
+               f"{r['min'] * 1000:>10.2f} {r['median'] * 1000:>10.2f}"
+        old = previous.get(_key(r))
+        if old and old["median"] > 0:
+            line += f"  {r['median'] / old['median']:.2f}x"
+        print(line, file=sys.stderr)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS,
+                        help="database sizes to generate (e.g. 1000 1000000)")
+    parser.add_argument("--browser", action="append", choices=BROWSERS,
+                        help="browser to benchmark (repeatable, default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per operation")
+    parser.add_argument("--output", type=Path, help="write JSON results here (default: stdout)")
+    parser.add_argument("--compare", type=Path, help="previous JSON results to compare against")
+    parser.add_argument("--keep", action="store_true", help="keep the generated home directories")
+    args = parser.parse_args(argv)
+
+    browsers = args.browser or BROWSERS
+    from src.browsers import get_browser_class
+    for name in browsers:
+        if get_browser_class(name)().is_running():
+            raise SystemExit(f"Close {name} first: cleaning would force quit it")
+
+    results = []
+    real_home = os.environ.get("HOME")
+    try:
+        for rows in args.rows:
+            for name in browsers:
+                home = Path(tempfile.mkdtemp(prefix=f"cookie_bench_{name}_{rows}_"))
+                os.environ["HOME"] = str(home)
+                try:
+                    results.extend(bench_browser(name, home, rows, args.repeat))
+                finally:
+                    if not args.keep:
+                        shutil.rmtree(home, ignore_errors=True)
+    finally:
+        if real_home is None:
+            os.environ.pop("HOME", None)
+        else:
+            os.environ["HOME"] = real_home
+
+    report = {
+        "meta": {
+            "revision": _git_revision(),
+            "created": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_table(results, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""Clean the browsers of many users in one run.
+
+Each home directory is handled by a worker process, so profile discovery,
+process checks and SQLite work for different users overlap. The disk-heavy
+part (backup snapshot, DELETE and compaction) is additionally bounded by a
+semaphore shared across the pool, so a host with hundreds of homes is not
+flooded with concurrent database rewrites.
+
+Backups are kept in the administrator's store, one sub-store per home
+directory, rather than written into the users' home directories.
+"""
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .browsers import browser_names, get_browser_class
+from .utils.backup import BackupStore
+from .utils.system import get_path_owner
+
+logger = logging.getLogger(__name__)
+
+# Set in each worker process by _init_worker
+_io_slots = None
+
+def default_homes_root() -> Path:
+    """Folder holding the users' home directories on this platform"""
+    if sys.platform == "win32":
+        return Path(os.environ.get("SystemDrive", "C:") + "\\") / "Users"
+    elif sys.platform == "darwin":
+        return Path("/Users")
+    return Path("/home")
+
+def find_homes(root: Optional[Path] = None) -> List[Path]:
+    """List the home directories directly below root"""
+    root = Path(root) if root else default_homes_root()
+    homes = []
+    try:
+        for entry in os.scandir(root):
+            if entry.is_dir(follow_symlinks=False) and not entry.name.startswith("."):
+                homes.append(Path(entry.path))
+    except OSError as e:
+        logger.error(f"Error listing homes in {root}: {str(e)}")
+    return sorted(homes)
+
+def user_name(home: Path) -> str:
+    """Name a report entry after the owner of home, falling back to the folder name"""
+    return get_path_owner(home) or home.name
+
+def _init_worker(io_slots) -> None:
+    global _io_slots
+    _io_slots = io_slots
+
+def clean_home(home: Path, browsers: Optional[List[str]] = None,
+               include: Optional[List[str]] = None, exclude: Optional[List[str]] = None,
+               compact: bool = False, force: bool = False,
+               backup_root: Optional[Path] = None) -> Dict:
+    """Clean every installed browser under one home directory.
+
+    Returns a report with the per-profile results of each browser.
+    """
+    started = time.perf_counter()
+    user = user_name(home)
+    report = {"user": user, "home": str(home), "browsers": {}, "removed": 0, "error": None}
+    store = BackupStore(root=Path(backup_root) / home.name) if backup_root else None
+    try:
+        for name in browsers or browser_names():
+            browser = get_browser_class(name)(home=home, backup_store=store)
+            if not browser.is_installed():
+                continue
+            if _io_slots is not None:
+                _io_slots.acquire()
+            try:
+                results = browser.clean_all_profiles(
+                    include=include, exclude=exclude, max_workers=1, compact=compact, force=force
+                )
+            finally:
+                if _io_slots is not None:
+                    _io_slots.release()
+            report["browsers"][name] = {
+                profile: {"success": r.success, "initial": r.initial, "final": r.final}
+                for profile, r in results.items()
+            }
+            report["removed"] += sum(r.initial - r.final for r in results.values() if r.success)
+    except Exception as e:
+        logger.error(f"Error cleaning {home}: {str(e)}")
+        report["error"] = str(e)
+    report["seconds"] = time.perf_counter() - started
+    return report
+
+def clean_homes(homes: Iterable[Path], browsers: Optional[List[str]] = None,
+                include: Optional[List[str]] = None, exclude: Optional[List[str]] = None,
+                compact: bool = False, force: bool = False,
+                max_workers: Optional[int] = None, io_concurrency: int = 4,
+                backup_root: Optional[Path] = None) -> Dict[str, Dict]:
+    """Clean many home directories with a process pool.
+
+    Args:
+        homes: Home directories to clean
+        browsers: Registered browser names (default: all)
+        max_workers: Worker processes (default: CPU count)
+        io_concurrency: Browsers cleaned at the same time across all workers
+        backup_root: Store snapshots in <backup_root>/<home folder name>
+            (default: ~/.cookie_cleaner/backups/users)
+
+    Returns a report per user, keyed by user name.
+    """
+    homes = list(homes)
+    if backup_root is None:
+        backup_root = Path.home() / ".cookie_cleaner" / "backups" / "users"
+    io_slots = multiprocessing.BoundedSemaphore(max(1, io_concurrency))
+
+    reports = {}
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(io_slots,)) as pool:
+        futures = {
+            pool.submit(clean_home, home, browsers, include, exclude,
+                        compact, force, backup_root): home
+            for home in homes
+        }
+        for future in as_completed(futures):
+            home = futures[future]
+            try:
+                report = future.result()
+            except Exception as e:
+                logger.error(f"Worker for {home} failed: {str(e)}")
+                report = {"user": user_name(home), "home": str(home), "browsers": {},
+                          "removed": 0, "error": str(e)}
+            # Homes sharing an owner are told apart by their path
+            key = report["user"] if report["user"] not in reports else report["home"]
+            reports[key] = report
+    return dict(sorted(reports.items()))
@@ -1,7 +1,102 @@
-"""Browser implementations for cookie cleaning."""
-from .base import BrowserBase
-from .chrome import ChromeBrowser
-from .firefox import FirefoxBrowser
-from .edge import EdgeBrowser
+"""Browser implementations for cookie cleaning.
 
-__all__ = ['BrowserBase', 'ChromeBrowser', 'FirefoxBrowser', 'EdgeBrowser']
\ No newline at end of file
+Browsers are looked up through a registry and only imported and
+instantiated on first use. Third-party implementations can register
+themselves under the ``cookie_cleaner.browsers`` entry point group with a
+``module:Class`` target.
+"""
+import importlib
+import logging
+import sys
+import threading
+from typing import Dict, Iterator, List, Tuple, Type, Union
+from .base import BrowserBase, CleanResult, CookieRecord, DeleteProgress
+
+ENTRY_POINT_GROUP = "cookie_cleaner.browsers"
+
+# name -> "module:Class" (relative to this package) or an imported class
+_registry: Dict[str, Union[str, Type[BrowserBase]]] = {
+    "chrome": ".chrome:ChromeBrowser",
+    "firefox": ".firefox:FirefoxBrowser",
+    "edge": ".edge:EdgeBrowser",
+}
+_instances: Dict[str, BrowserBase] = {}
+_entry_points_loaded = False
+_lock = threading.RLock()
+
+def _load_entry_points() -> None:
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    try:
+        from importlib.metadata import entry_points
+        if sys.version_info >= (3, 10):
+            group = entry_points(group=ENTRY_POINT_GROUP)
+        else:
+            # Python 3.8/3.9 return a dict of groups and take no selection arguments
+            group = entry_points().get(ENTRY_POINT_GROUP, [])
+        for entry_point in group:
+            _registry.setdefault(entry_point.name, entry_point.value)
+    except Exception as e:
+        logging.getLogger(__name__).error(f"Error loading browser entry points: {str(e)}")
+
+def register_browser(name: str, target: Union[str, Type[BrowserBase]]) -> None:
+    """Register a browser class, or a lazy "module:Class" reference to one"""
+    with _lock:
+        _registry[name] = target
+        _instances.pop(name, None)
+
+def browser_names() -> List[str]:
+    """Get the names of all registered browsers"""
+    with _lock:
+        _load_entry_points()
+        return list(_registry)
+
+def get_browser_class(name: str) -> Type[BrowserBase]:
+    """Import (on first use) and return the class registered under name"""
+    with _lock:
+        _load_entry_points()
+        target = _registry[name]
+        if isinstance(target, str):
+            module_name, _, class_name = target.partition(":")
+            module = importlib.import_module(module_name, __name__)
+            target = _registry[name] = getattr(module, class_name)
+        return target
+
+def get_browser(name: str) -> BrowserBase:
+    """Get the shared instance of the browser registered under name"""
+    with _lock:
+        if name not in _instances:
+            _instances[name] = get_browser_class(name)()
+        return _instances[name]
+
+def iter_browsers(installed_only: bool = True) -> Iterator[Tuple[str, BrowserBase]]:
+    """Yield (name, browser) for each registered, optionally installed, browser"""
+    for name in browser_names():
+        try:
+            browser = get_browser(name)
+        except Exception as e:
+            logging.getLogger(__name__).error(f"Error loading browser {name}: {str(e)}")
+            continue
+        if not installed_only or browser.is_installed():
+            yield name, browser
+
+_LAZY_CLASSES = {
+    "ChromeBrowser": "chrome",
+    "FirefoxBrowser": "firefox",
+    "EdgeBrowser": "edge",
+}
+
+def __getattr__(attr):
+    # Keep `from src.browsers import ChromeBrowser` working without
+    # importing every implementation up front
+    if attr in _LAZY_CLASSES:
+        return get_browser_class(_LAZY_CLASSES[attr])
+    raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
+
+__all__ = [
+    'BrowserBase', 'CleanResult', 'CookieRecord', 'DeleteProgress', 'ChromeBrowser', 'FirefoxBrowser', 'EdgeBrowser',
+    'register_browser', 'browser_names', 'get_browser_class', 'get_browser',
+    'iter_browsers'
+]
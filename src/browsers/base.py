@@ -1,28 +1,252 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager, nullcontext
+import copy
+from itertools import islice
 from pathlib import Path
 import logging
+import os
 import sqlite3
-from typing import List, Tuple, Optional
+import threading
+import time
+from typing import Callable, ContextManager, Dict, Iterable, Iterator, List, NamedTuple, Tuple, Optional
+from ..utils.backup import BackupStore, get_backup_store
+from ..utils.cache import PurgeResult, purge_paths
+from ..utils.metrics import Span, span
+from ..utils.system import get_path_owner, terminate_processes
+from .domains import DomainSummary, merge_summaries, parse_domain_patterns, registrable_domain
+from .profiles import Profile, default_profile
+
+class DeleteProgress(NamedTuple):
+    """Progress of a chunked delete, reported after every committed chunk"""
+    source: str
+    done: int
+    total: int
+    rows_per_second: float
+
+ProgressCallback = Callable[[DeleteProgress], None]
+
+class CleanResult(NamedTuple):
+    """Outcome of cleaning or pruning one profile.
+
+    cancelled is set when a cancel request stopped the delete early; the
+    chunks deleted before that stay deleted and are reflected in final.
+    """
+    success: bool
+    initial: int
+    final: int
+    cancelled: bool = False
+
+class CookieRecord:
+    """One stored cookie; columns left out of the projection are None.
+
+    expiry is in Unix seconds for every browser, None for session cookies.
+    rowid is where ``iter_cookies`` resumes after this record.
+    """
+    __slots__ = ("host", "name", "path", "value", "expiry", "rowid")
+
+    # Optional columns; host, name and path are always read
+    COLUMNS = ("value", "expiry")
+
+    def __init__(self, host: str, name: str, path: str,
+                 value: Optional[str] = None, expiry: Optional[int] = None,
+                 rowid: Optional[int] = None):
+        self.host = host
+        self.name = name
+        self.path = path
+        self.value = value
+        self.expiry = expiry
+        self.rowid = rowid
+
+    def _astuple(self) -> tuple:
+        return (self.host, self.name, self.path, self.value, self.expiry)
+
+    def _asdict(self) -> Dict:
+        # rowid is a read position rather than cookie data
+        return dict(zip(self.__slots__, self._astuple()))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CookieRecord):
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{k}={v!r}" for k, v in self._asdict().items() if v is not None)
+        return f"CookieRecord({fields})"
+
+# Cookie counts keyed by database path, tagged with the stat signature of
+# the database and its WAL at the time they were taken
+_count_cache: Dict[str, Tuple[tuple, int]] = {}
+_count_cache_lock = threading.Lock()
+# Domain summaries keyed by (database path, by_site, limit), tagged the same way
+_summary_cache: Dict[tuple, Tuple[tuple, List[DomainSummary]]] = {}
 
 class BrowserBase(ABC):
     """Abstract base class for browser cookie management"""
     
-    def __init__(self):
+    # Memory-map up to this many bytes of the cookie database on reads
+    MMAP_SIZE = 256 * 1024 * 1024
+    # Wait for a browser's own short write locks once a read has started
+    BUSY_TIMEOUT_MS = 5000
+    # Rows fetched per round trip by iter_cookies
+    BATCH_SIZE = 1000
+    # Skip VACUUM unless it would reclaim at least this many bytes
+    COMPACT_THRESHOLD = 1024 * 1024
+    # Rows deleted per transaction when cleaning or pruning
+    DELETE_CHUNK_SIZE = 5000
+    # Page cache for deletes, so index updates don't spill to disk mid-transaction
+    DELETE_CACHE_SIZE = 64 * 1024 * 1024
+
+    # Process names (or substrings) identifying a running browser
+    PROCESS_NAMES: List[str] = []
+
+    # Short identifier used for backups and lookups, e.g. "chrome"
+    NAME: str
+    # Name shown to users, e.g. "Chrome"
+    DISPLAY_NAME: str
+
+    # Subclasses name the table and the columns that differ between schemas
+    TABLE_NAME: str
+    HOST_COLUMN: str
+    EXPIRY_COLUMN: str
+    # SQL condition selecting expired, non-session cookies
+    EXPIRED_CONDITION: str
+    # SQL expressions for the expiry in Unix seconds and the stored value size
+    EXPIRY_UNIX: str
+    VALUE_BYTES: str
+
+    def __init__(self, profile: Optional[Profile] = None,
+                 backup_store: Optional[BackupStore] = None,
+                 home: Optional[Path] = None):
+        """
+        Args:
+            profile: Profile to bind to (default: the browser's default profile)
+            backup_store: Store for pre-clean snapshots (default: the shared store)
+            home: Home directory to find profiles under (default: the current user's)
+        """
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.profile = profile
+        self._backup_store = backup_store
+        self.home = Path(home) if home else None
+
+    @property
+    def backup_store(self) -> BackupStore:
+        """Store receiving the pre-clean snapshots"""
+        return self._backup_store or get_backup_store()
+
+    def get_home(self) -> Path:
+        """Get the home directory the browser's folders are resolved against"""
+        return self.home or Path.home()
+
+    def get_owner(self) -> Optional[str]:
+        """Get the user whose processes count as this browser running.
+
+        None (any user) unless an explicit home was given, in which case only
+        processes of the home's owner are checked and terminated.
+        """
+        return get_path_owner(self.home) if self.home else None
 
     @abstractmethod
     def get_cookie_path(self) -> Optional[Path]:
-        """Get the path to the cookie database"""
+        """Get the path to the cookie database of the bound or default profile"""
         pass
 
     @abstractmethod
-    def get_cookie_details(self) -> List[Tuple]:
-        """Get details of stored cookies"""
+    def get_data_dir(self) -> Optional[Path]:
+        """Get the folder holding the browser's profiles"""
         pass
 
+    def is_installed(self) -> bool:
+        """Check whether the browser has a profile folder on this machine"""
+        data_dir = self.get_data_dir()
+        return bool(data_dir and data_dir.is_dir())
+
+    @abstractmethod
+    def get_profiles(self) -> List[Profile]:
+        """Get every profile of this browser installation"""
+        pass
+
+    def for_profile(self, profile: Profile) -> "BrowserBase":
+        """Return a copy of this browser bound to profile"""
+        browser = copy.copy(self)
+        browser.profile = profile
+        return browser
+
+    def _span(self, phase: str) -> ContextManager[Span]:
+        """Time a phase of work on this browser, labelled with the bound profile"""
+        return span(phase, browser=self.NAME, profile=self.profile.name if self.profile else None)
+
+    def get_profile_cache_paths(self, profile: Profile) -> List[Path]:
+        """Get the cache folders belonging to profile"""
+        return []
+
+    def get_cache_paths(self) -> List[Path]:
+        """Get the cache folders of the bound profile, or of every profile"""
+        profiles = [self.profile] if self.profile else self.get_profiles()
+        paths = []
+        for profile in profiles:
+            paths.extend(self.get_profile_cache_paths(profile))
+        return paths
+
+    def clear_cache(self, progress: Optional[Callable[[int, int], None]] = None,
+                    max_workers: int = 8) -> PurgeResult:
+        """Delete the browser's cache folders in parallel.
+
+        progress is called with running (files, bytes) totals. Returns the
+        files and bytes reclaimed.
+        """
+        paths = [p for p in self.get_cache_paths() if os.path.lexists(p)]
+        with self._span("cache_purge") as s:
+            result = purge_paths(paths, max_workers=max_workers, progress=progress)
+            s.rows, s.bytes = result.files, result.bytes
+        self.logger.info(
+            f"Cleared cache: {result.files} files, {result.bytes} bytes "
+            f"from {len(paths)} folders ({result.errors} errors)"
+        )
+        return result
+
+    def get_profile_name(self) -> str:
+        """Get the name of the bound or default profile"""
+        if self.profile:
+            return self.profile.name
+        profile = default_profile(self.get_profiles())
+        return profile.name if profile else "Default"
+
+    def restore_backup(self, snapshot: Optional[str] = None) -> bool:
+        """Restore the profile's cookies from a snapshot (latest by default)"""
+        try:
+            if not self.ensure_closed():
+                raise RuntimeError("Browser is running")
+            target = self.backup_store.restore(self.NAME, self.get_profile_name(), snapshot)
+            self.invalidate_count(target)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error restoring cookies: {str(e)}")
+            return False
+
+    def profile_browsers(self) -> List["BrowserBase"]:
+        """Get a bound browser for every profile that has a cookie database"""
+        return [self.for_profile(p) for p in self.get_profiles() if p.cookie_path]
+
     @abstractmethod
-    def clean_cookies(self) -> Tuple[bool, int, int]:
-        """Clean all cookies. Returns (success, initial_count, final_count)"""
+    def clean_cookies(self, include: Optional[Iterable[str]] = None,
+                      exclude: Optional[Iterable[str]] = None,
+                      compact: bool = False,
+                      chunk_size: Optional[int] = None,
+                      progress: Optional[ProgressCallback] = None,
+                      cancel: Optional[threading.Event] = None) -> CleanResult:
+        """Clean cookies. Returns a ``CleanResult``
+
+        Without patterns every cookie is removed. include limits cleaning to
+        hosts matching those domain patterns and exclude keeps matching
+        hosts; see ``parse_domain_pattern`` for the pattern syntax. With
+        compact the database is checkpointed and vacuumed afterwards.
+
+        Rows are deleted chunk_size at a time (see ``_delete_where``);
+        progress receives a ``DeleteProgress`` after every chunk, and once
+        cancel is set no further chunk is started and the result is marked
+        cancelled.
+        """
         pass
 
     @abstractmethod
@@ -30,19 +254,602 @@ class BrowserBase(ABC):
         """Check if the browser is currently running"""
         pass
 
+    def force_quit(self, timeout: Optional[float] = None) -> bool:
+        """Terminate the browser's process tree. Returns True once it is gone"""
+        try:
+            return terminate_processes(self.PROCESS_NAMES, timeout=timeout, user=self.get_owner())
+        except Exception as e:
+            self.logger.error(f"Error force quitting {self.DISPLAY_NAME}: {str(e)}")
+            return False
+
+    def ensure_closed(self, force: bool = False) -> bool:
+        """Make sure the browser is not running, quitting it if force is set.
+
+        Returns False if it is still running.
+        """
+        if not self.is_running():
+            return True
+        if force:
+            self.logger.info(f"Attempting to force quit {self.DISPLAY_NAME}...")
+            return self.force_quit()
+        return False
+
+    def clean_all_profiles(self, include: Optional[Iterable[str]] = None,
+                           exclude: Optional[Iterable[str]] = None,
+                           max_workers: Optional[int] = None,
+                           compact: bool = False,
+                           force: bool = False,
+                           chunk_size: Optional[int] = None,
+                           progress: Optional[ProgressCallback] = None,
+                           cancel: Optional[threading.Event] = None) -> Dict[str, CleanResult]:
+        """Clean every profile in parallel. Returns results keyed by profile name
+
+        With force a running browser is shut down first. chunk_size,
+        progress and cancel are passed on to ``clean_cookies``.
+        """
+        # Close the browser once up front rather than from every worker
+        if not self.ensure_closed(force):
+            self.logger.error("Browser is still running, skipping all profiles")
+            return {self.get_profile_name(): CleanResult(False, 0, 0)}
+
+        browsers = self.profile_browsers()
+        if not browsers:
+            return {"Default": self.clean_cookies(include, exclude, compact,
+                                                  chunk_size, progress, cancel)}
+
+        include = list(include) if include else None
+        exclude = list(exclude) if exclude else None
+        with ThreadPoolExecutor(max_workers=max_workers or len(browsers)) as pool:
+            futures = {
+                b.profile.name: pool.submit(b.clean_cookies, include, exclude, compact,
+                                            chunk_size, progress, cancel)
+                for b in browsers
+            }
+        return {name: future.result() for name, future in futures.items()}
+
+    def count_all_profiles(self) -> int:
+        """Get the total number of cookies across all profiles"""
+        browsers = self.profile_browsers()
+        if not browsers:
+            return self.get_cookie_count()
+        counts = [b.get_cookie_count() for b in browsers]
+        return -1 if any(count < 0 for count in counts) else sum(counts)
+
+    def _connect_readonly(self, cookie_path: Path,
+                          check_same_thread: bool = True) -> sqlite3.Connection:
+        """Open the live database read-only, falling back to an in-memory copy.
+
+        The database is opened in place through a ``mode=ro`` URI, so reads
+        only touch the pages they need. If the browser holds a lock on the
+        file, an immutable handle is snapshotted into memory with the online
+        backup API instead. The probe does not wait on the lock: a running
+        browser keeps it for as long as it is open.
+        """
+        uri = cookie_path.resolve().as_uri()
+        conn = sqlite3.connect(f"{uri}?mode=ro", uri=True, timeout=0,
+                               check_same_thread=check_same_thread)
+        try:
+            conn.execute(f"PRAGMA mmap_size={self.MMAP_SIZE}")
+            conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+            conn.execute(f"PRAGMA busy_timeout={self.BUSY_TIMEOUT_MS}")
+            return conn
+        except sqlite3.OperationalError as e:
+            conn.close()
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            self.logger.info(f"Cookie database locked, reading snapshot: {cookie_path}")
+
+        source = sqlite3.connect(f"{uri}?mode=ro&immutable=1", uri=True)
+        try:
+            memory = sqlite3.connect(":memory:", check_same_thread=check_same_thread)
+            source.backup(memory)
+            return memory
+        finally:
+            source.close()
+
+    def _connect_write(self, cookie_path: Path) -> sqlite3.Connection:
+        """Open cookie_path for deleting, with a page cache of DELETE_CACHE_SIZE"""
+        conn = sqlite3.connect(str(cookie_path))
+        conn.execute(f"PRAGMA cache_size=-{self.DELETE_CACHE_SIZE // 1024}")
+        return conn
+
+    @contextmanager
+    def open_readonly(self, cookie_path: Path) -> Iterator[sqlite3.Connection]:
+        """Context manager yielding a read-only connection to cookie_path"""
+        conn = self._connect_readonly(cookie_path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def connect_cookies(self) -> Optional[sqlite3.Connection]:
+        """Open a read-only connection for repeated ``iter_cookies`` calls.
+
+        Each call of ``iter_cookies`` otherwise opens the database again,
+        which on a locked database means a fresh in-memory snapshot. The
+        connection may be used from any thread, one at a time, and the
+        caller closes it. None if the profile has no cookie database.
+        """
+        cookie_path = self.get_cookie_path()
+        if not cookie_path or not cookie_path.exists():
+            return None
+        return self._connect_readonly(cookie_path, check_same_thread=False)
+
+    @staticmethod
+    def _stat_signature(cookie_path: Path) -> tuple:
+        """(size, mtime) of the database and its WAL; changes on every write.
+
+        An empty WAL counts as no WAL: opening a WAL database, even
+        read-only, creates one, and that must not look like a write.
+        """
+        signature = []
+        wal = cookie_path.with_name(cookie_path.name + "-wal")
+        for path in (cookie_path, wal):
+            try:
+                st = os.stat(path)
+            except OSError:
+                signature.append(None)
+                continue
+            empty_wal = path == wal and st.st_size == 0
+            signature.append(None if empty_wal else (st.st_size, st.st_mtime_ns))
+        return tuple(signature)
+
+    def _store_count(self, cookie_path: Path, count: int) -> None:
+        """Record count as current for cookie_path's present state"""
+        with _count_cache_lock:
+            _count_cache[str(cookie_path)] = (self._stat_signature(cookie_path), count)
+
+    def invalidate_count(self, cookie_path: Optional[Path] = None) -> None:
+        """Forget the cached count, e.g. after writing to the database"""
+        cookie_path = cookie_path or self.get_cookie_path()
+        if cookie_path:
+            with _count_cache_lock:
+                _count_cache.pop(str(cookie_path), None)
+
     def get_cookie_count(self) -> int:
-        """Get the total number of cookies"""
+        """Get the total number of cookies.
+
+        The count is cached against the stat signature of the database and
+        its WAL, so the table is only re-counted after the file changed.
+        """
         try:
             cookie_path = self.get_cookie_path()
             if not cookie_path or not cookie_path.exists():
                 return 0
+
+            signature = self._stat_signature(cookie_path)
+            with _count_cache_lock:
+                cached = _count_cache.get(str(cookie_path))
+            if cached and cached[0] == signature:
+                return cached[1]
             
-            conn = sqlite3.connect(str(cookie_path))
-            c = conn.cursor()
-            c.execute(self.COUNT_QUERY)
-            count = c.fetchone()[0]
-            conn.close()
+            with self._span("count") as s, self.open_readonly(cookie_path) as conn:
+                count = s.rows = conn.execute(self.COUNT_QUERY).fetchone()[0]
+            with _count_cache_lock:
+                _count_cache[str(cookie_path)] = (signature, count)
             return count
         except Exception as e:
             self.logger.error(f"Error counting cookies: {str(e)}")
-            return -1
\ No newline at end of file
+            return -1
+
+    @classmethod
+    def expiry_sql(cls) -> str:
+        """SQL expression for the expiry in Unix seconds, NULL for session cookies"""
+        return f"CASE WHEN {cls.EXPIRY_COLUMN} = 0 THEN NULL ELSE {cls.EXPIRY_UNIX} END"
+
+    def _projection(self, columns: Iterable[str]) -> str:
+        """SELECT list for a CookieRecord, with NULL for unrequested columns"""
+        columns = set(columns)
+        unknown = columns - set(CookieRecord.COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown cookie column: {', '.join(sorted(unknown))}")
+        value = "value" if "value" in columns else "NULL"
+        expiry = self.expiry_sql() if "expiry" in columns else "NULL"
+        return f"{self.HOST_COLUMN}, name, path, {value}, {expiry}"
+
+    def iter_cookies(self, batch_size: int = BATCH_SIZE, after_rowid: int = 0,
+                     columns: Iterable[str] = ("expiry",),
+                     conn: Optional[sqlite3.Connection] = None) -> Iterator[CookieRecord]:
+        """Yield a CookieRecord for every cookie.
+
+        Rows come out in rowid (storage) order and are fetched batch_size
+        at a time, each page seeking past the last rowid seen, so memory
+        stays flat and every page costs the same however large the table
+        is. Callers wanting another order sort what they read. Pass the
+        rowid of the last record seen as after_rowid to resume from there.
+
+        host, name and path are always read; columns picks which of
+        ``CookieRecord.COLUMNS`` are read as well. The value is left out
+        unless asked for, since it is often the largest part of a row.
+        Reads go through conn (from ``connect_cookies``) when given, and
+        through a connection opened for this call otherwise.
+        """
+        if conn is None:
+            cookie_path = self.get_cookie_path()
+            if not cookie_path or not cookie_path.exists():
+                return
+
+        # Only the rowid is indexed in every schema (Firefox has no index
+        # leading with host), so paging on it never scans or sorts
+        query = (f"SELECT {self._projection(columns)}, rowid FROM {self.TABLE_NAME} "
+                 f"WHERE rowid > ? ORDER BY rowid LIMIT ?")
+        try:
+            with nullcontext(conn) if conn is not None else self.open_readonly(cookie_path) as conn:
+                while True:
+                    batch = conn.execute(query, (after_rowid, batch_size)).fetchall()
+                    for row in batch:
+                        yield CookieRecord(*row)
+                    if len(batch) < batch_size:
+                        break
+                    after_rowid = batch[-1][-1]
+        except Exception as e:
+            self.logger.error(f"Error reading cookies: {str(e)}")
+
+    def get_cookie_details(self, limit: int = 100, after_rowid: int = 0,
+                           columns: Iterable[str] = ("expiry",),
+                           conn: Optional[sqlite3.Connection] = None) -> List[CookieRecord]:
+        """Get details of the first limit stored cookies after after_rowid"""
+        with closing(self.iter_cookies(limit, after_rowid, columns, conn)) as cookies:
+            return list(islice(cookies, limit))
+
+    def summarize_domains(self, by_site: bool = False,
+                          limit: Optional[int] = None) -> List[DomainSummary]:
+        """Aggregate the cookies per host, busiest first.
+
+        Hosts are grouped in SQLite, so only one row per host leaves the
+        database. With by_site the host groups are folded further into
+        their registrable domain (eTLD+1, see ``registrable_domain``).
+        Session cookies are left out of the expiry range. Results are
+        cached against the database's stat signature like the count.
+        """
+        cookie_path = self.get_cookie_path()
+        if not cookie_path or not cookie_path.exists():
+            return []
+
+        key = (str(cookie_path), by_site, limit)
+        signature = self._stat_signature(cookie_path)
+        with _count_cache_lock:
+            cached = _summary_cache.get(key)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        host = self.HOST_COLUMN
+        expiry = self.expiry_sql()
+        domain = "registrable_domain(host)" if by_site else "ltrim(lower(host), '.')"
+        query = f"""
+            SELECT {domain} AS domain, SUM(cookies), SUM(bytes), MIN(earliest), MAX(latest)
+            FROM (
+                SELECT {host} AS host, COUNT(*) AS cookies,
+                       SUM({self.VALUE_BYTES}) AS bytes,
+                       MIN({expiry}) AS earliest, MAX({expiry}) AS latest
+                FROM main.{self.TABLE_NAME} GROUP BY {host}
+            )
+            GROUP BY domain ORDER BY 2 DESC, 1 LIMIT ?
+        """
+        try:
+            with self._span("summary") as s, self.open_readonly(cookie_path) as conn:
+                if by_site:
+                    conn.create_function("registrable_domain", 1, registrable_domain,
+                                         deterministic=True)
+                rows = conn.execute(query, (-1 if limit is None else limit,)).fetchall()
+                s.rows = len(rows)
+            summary = [DomainSummary(*row) for row in rows]
+            with _count_cache_lock:
+                _summary_cache[key] = (signature, summary)
+            return summary
+        except Exception as e:
+            self.logger.error(f"Error summarizing cookies: {str(e)}")
+            return []
+
+    def summarize_all_profiles(self, by_site: bool = False,
+                               limit: Optional[int] = None) -> List[DomainSummary]:
+        """Per-domain summary merged across every profile"""
+        browsers = self.profile_browsers() or [self]
+        return merge_summaries((b.summarize_domains(by_site) for b in browsers), limit)
+
+    def _match_hosts(self, conn: sqlite3.Connection, label: str,
+                     patterns: Iterable[str], since_rowid: int = 0) -> str:
+        """Load the hosts matching patterns into a temp table and return its name.
+
+        The patterns go into an indexed temp table, and every distinct host
+        is joined against it once per domain suffix, so matching cost grows
+        with the number of distinct hosts rather than cookies x patterns.
+        Only hosts of rows after since_rowid are considered.
+        """
+        host = self.HOST_COLUMN
+        patterns_table = f"temp.{label}_patterns"
+        hosts_table = f"temp.{label}_hosts"
+        conn.execute(f"DROP TABLE IF EXISTS {patterns_table}")
+        conn.execute(f"DROP TABLE IF EXISTS {hosts_table}")
+        conn.execute(f"""
+            CREATE TABLE {patterns_table} (
+                domain TEXT NOT NULL,
+                subdomains INTEGER NOT NULL,
+                PRIMARY KEY (domain, subdomains)
+            ) WITHOUT ROWID
+        """)
+        conn.execute(f"CREATE TABLE {hosts_table} (host TEXT PRIMARY KEY) WITHOUT ROWID")
+        conn.executemany(
+            f"INSERT OR IGNORE INTO {patterns_table} VALUES (?, ?)",
+            parse_domain_patterns(patterns)
+        )
+        conn.execute(f"""
+            INSERT OR IGNORE INTO {hosts_table}
+            WITH RECURSIVE suffix(host, rest) AS (
+                SELECT DISTINCT {host}, ltrim(lower({host}), '.') FROM main.{self.TABLE_NAME}
+                WHERE rowid > {int(since_rowid)}
+                UNION ALL
+                SELECT host, substr(rest, instr(rest, '.') + 1)
+                FROM suffix WHERE instr(rest, '.') > 0
+            )
+            SELECT suffix.host FROM suffix
+            JOIN {patterns_table} p ON p.domain = suffix.rest
+            WHERE p.subdomains OR suffix.rest = ltrim(lower(suffix.host), '.')
+        """)
+        return hosts_table
+
+    def _delete_where(self, conn: sqlite3.Connection, condition: str,
+                      chunk_size: Optional[int] = None,
+                      progress: Optional[ProgressCallback] = None,
+                      cancel: Optional[threading.Event] = None) -> Tuple[int, bool]:
+        """Delete the rows matching condition.
+
+        Returns (rows deleted, whether cancel stopped the delete early).
+
+        Without progress or cancel the rows go in one statement and one
+        commit. Otherwise each chunk is the next chunk_size (default
+        DELETE_CHUNK_SIZE) matching rowids and is committed on its own, so
+        the write lock is released between chunks. progress is called after
+        every commit, and the loop stops before the next chunk once cancel
+        is set; chunks already committed stay deleted. The matching rows
+        are only counted up front when progress needs a total.
+        """
+        table = f"main.{self.TABLE_NAME}"
+        condition = f"({condition})"
+        if progress is None and cancel is None:
+            deleted = conn.execute(f"DELETE FROM {table} WHERE {condition}").rowcount
+            conn.commit()
+            return deleted, False
+
+        chunk_size = chunk_size or self.DELETE_CHUNK_SIZE
+        source = f"{self.NAME}/{self.get_profile_name()}"
+        total = (conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {condition}").fetchone()[0]
+                 if progress else None)
+
+        deleted = 0
+        last_rowid = None
+        started = time.monotonic()
+        while total is None or deleted < total or last_rowid is None:
+            if cancel is not None and cancel.is_set():
+                of_total = "" if total is None else f" of {total}"
+                self.logger.info(f"Delete cancelled after {deleted}{of_total} rows")
+                return deleted, True
+            after = "" if last_rowid is None else "rowid > ? AND "
+            rowids = [row[0] for row in conn.execute(
+                f"SELECT rowid FROM {table} WHERE {after}{condition} ORDER BY rowid LIMIT ?",
+                (() if last_rowid is None else (last_rowid,)) + (chunk_size,)
+            )]
+            if not rowids:
+                break
+            deleted += conn.execute(
+                f"DELETE FROM {table} WHERE rowid BETWEEN ? AND ? AND {condition}",
+                (rowids[0], rowids[-1])
+            ).rowcount
+            conn.commit()
+            last_rowid = rowids[-1]
+            if progress:
+                elapsed = time.monotonic() - started
+                progress(DeleteProgress(source, deleted, max(total, deleted),
+                                        deleted / elapsed if elapsed > 0 else 0.0))
+            if len(rowids) < chunk_size:
+                break
+        return deleted, False
+
+    def _delete_cookies(self, conn: sqlite3.Connection,
+                        include: Optional[Iterable[str]] = None,
+                        exclude: Optional[Iterable[str]] = None,
+                        chunk_size: Optional[int] = None,
+                        progress: Optional[ProgressCallback] = None,
+                        cancel: Optional[threading.Event] = None) -> Tuple[int, bool]:
+        """Delete the cookies selected by include/exclude; see ``_delete_where``"""
+        conditions = []
+        if include:
+            conditions.append(f"{self.HOST_COLUMN} IN {self._match_hosts(conn, 'include', include)}")
+        if exclude:
+            conditions.append(f"{self.HOST_COLUMN} NOT IN {self._match_hosts(conn, 'exclude', exclude)}")
+        condition = " AND ".join(conditions) or "1"
+        return self._delete_where(conn, condition, chunk_size, progress, cancel)
+
+    @staticmethod
+    def _database_bytes(cookie_path: Path) -> int:
+        """Size of the database plus its WAL"""
+        total = 0
+        for path in (cookie_path, cookie_path.with_name(cookie_path.name + "-wal")):
+            try:
+                total += os.stat(path).st_size
+            except OSError:
+                pass
+        return total
+
+    def compact_database(self, cookie_path: Optional[Path] = None,
+                         min_gain: Optional[int] = None) -> Tuple[int, int]:
+        """Checkpoint the WAL and vacuum free space. Returns (bytes_before, bytes_after)
+
+        The WAL is always truncated, as that is cheap. Space is only
+        reclaimed when at least min_gain bytes (default COMPACT_THRESHOLD)
+        are free, counting both free pages and the unused part of
+        partly-filled pages, which is where a selective delete leaves most
+        of its space (see ``_reclaimable_bytes``). incremental_vacuum is
+        used where the database enables it and the free pages alone are
+        enough, a full VACUUM otherwise.
+        """
+        cookie_path = cookie_path or self.get_cookie_path()
+        if not cookie_path or not cookie_path.exists():
+            return 0, 0
+        min_gain = self.COMPACT_THRESHOLD if min_gain is None else min_gain
+        before = self._database_bytes(cookie_path)
+
+        with self._span("compact") as s:
+            conn = sqlite3.connect(str(cookie_path), isolation_level=None)
+            try:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+                page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+                free_bytes = conn.execute("PRAGMA freelist_count").fetchone()[0] * page_size
+                auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+                reclaimable = self._reclaimable_bytes(conn, free_bytes)
+                if reclaimable is not None and reclaimable < min_gain:
+                    self.logger.info(f"Skipping vacuum, only {reclaimable} bytes free")
+                elif auto_vacuum == 2 and free_bytes >= min_gain:
+                    conn.execute("PRAGMA incremental_vacuum").fetchall()
+                else:
+                    conn.execute("VACUUM")
+                # VACUUM goes through the WAL too
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+            finally:
+                conn.close()
+                self.invalidate_count(cookie_path)
+
+            after = self._database_bytes(cookie_path)
+            s.bytes = before - after
+        self.logger.info(f"Compacted {cookie_path}: {before} -> {after} bytes")
+        return before, after
+
+    def _reclaimable_bytes(self, conn: sqlite3.Connection, free_bytes: int) -> Optional[int]:
+        """Free pages plus unused bytes in used pages, or None if unknown.
+
+        The unused bytes come from the dbstat virtual table; SQLite builds
+        without it give None, and the caller then vacuums unconditionally.
+        """
+        try:
+            unused = conn.execute("SELECT COALESCE(SUM(unused), 0) FROM dbstat").fetchone()[0]
+        except sqlite3.OperationalError as e:
+            self.logger.debug(f"dbstat unavailable, cannot estimate free space: {str(e)}")
+            return None
+        return free_bytes + unused
+
+    def _clean_database(self, cookie_path: Path,
+                        include: Optional[Iterable[str]] = None,
+                        exclude: Optional[Iterable[str]] = None,
+                        compact: bool = False,
+                        chunk_size: Optional[int] = None,
+                        progress: Optional[ProgressCallback] = None,
+                        cancel: Optional[threading.Event] = None) -> CleanResult:
+        """Back up cookie_path and delete the selected cookies"""
+        if cancel is not None and cancel.is_set():
+            count = self.get_cookie_count()
+            return CleanResult(True, count, count, cancelled=True)
+
+        # Snapshot into the backup store before cleaning
+        with self._span("backup") as s:
+            self.backup_store.snapshot(self.NAME, self.get_profile_name(), cookie_path)
+            s.bytes = self._database_bytes(cookie_path)
+
+        initial_count = self.get_cookie_count()
+
+        with self._span("delete") as s:
+            conn = self._connect_write(cookie_path)
+            try:
+                deleted, cancelled = self._delete_cookies(conn, include, exclude,
+                                                          chunk_size, progress, cancel)
+                s.rows = deleted
+            finally:
+                conn.close()
+                self.invalidate_count(cookie_path)
+
+        if compact and not cancelled:
+            self.compact_database(cookie_path)
+
+        # The delete already tells us the new count, no need to re-query
+        final_count = initial_count - deleted
+        self._store_count(cookie_path, final_count)
+        if cancelled:
+            self.logger.info(f"Cleaning cancelled after {deleted} cookies")
+        else:
+            self.logger.info(f"Successfully cleaned {deleted} cookies")
+        return CleanResult(True, initial_count, final_count, cancelled)
+
+    def prune_expired(self, chunk_size: Optional[int] = None,
+                      progress: Optional[ProgressCallback] = None,
+                      cancel: Optional[threading.Event] = None) -> CleanResult:
+        """Delete only expired cookies, keeping session and live ones.
+
+        Rows are deleted in chunks like ``clean_cookies`` does, so the write
+        lock is only held briefly. No backup is taken, since expired cookies
+        are never sent again. The browser is not closed for this; the prune
+        fails if it is running. Returns a ``CleanResult``.
+        """
+        try:
+            if self.is_running():
+                raise RuntimeError(f"{self.DISPLAY_NAME} is running")
+            cookie_path = self.get_cookie_path()
+            if not cookie_path or not cookie_path.exists():
+                raise FileNotFoundError("Cookie file not found")
+
+            initial_count = self.get_cookie_count()
+            with self._span("prune") as s:
+                conn = self._connect_write(cookie_path)
+                try:
+                    deleted, cancelled = self._delete_where(
+                        conn, self.EXPIRED_CONDITION, chunk_size, progress, cancel
+                    )
+                    s.rows = deleted
+                finally:
+                    conn.close()
+                    self.invalidate_count(cookie_path)
+
+            final_count = initial_count - deleted
+            self._store_count(cookie_path, final_count)
+            self.logger.info(f"Pruned {deleted} expired cookies")
+            return CleanResult(True, initial_count, final_count, cancelled)
+        except Exception as e:
+            self.logger.error(f"Error pruning expired cookies: {str(e)}")
+            return CleanResult(False, 0, 0)
+
+    def apply_policy(self, since_rowid: int = 0,
+                     blocked: Optional[Iterable[str]] = None,
+                     prune_expired: bool = True) -> Tuple[int, int]:
+        """Delete expired cookies, and blocked cookies added after since_rowid.
+
+        Blocked hosts are only matched among new rows, since older ones were
+        checked on earlier passes. Expiry is checked over the whole table, as
+        a cookie that was live on an earlier pass may have expired since;
+        neither schema indexes the expiry, so that is a table scan. Returns
+        (deleted, high_water_rowid); pass high_water_rowid back in on the
+        next call.
+        """
+        cookie_path = self.get_cookie_path()
+        if not cookie_path or not cookie_path.exists():
+            return 0, since_rowid
+
+        max_rowid = f"SELECT COALESCE(MAX(rowid), 0) FROM {self.TABLE_NAME}"
+        conn = self._connect_write(cookie_path)
+        try:
+            high_water = conn.execute(max_rowid).fetchone()[0]
+            if high_water < since_rowid:
+                # Top rows were deleted, so rowids may have been reused
+                since_rowid = 0
+
+            conditions = []
+            params = []
+            if prune_expired:
+                conditions.append(f"({self.EXPIRED_CONDITION})")
+            if blocked and high_water > since_rowid:
+                hosts = self._match_hosts(conn, "blocked", blocked, since_rowid)
+                conditions.append(f"(rowid > ? AND rowid <= ? AND {self.HOST_COLUMN} IN {hosts})")
+                params += [since_rowid, high_water]
+            if not conditions:
+                return 0, high_water
+
+            deleted = conn.execute(
+                f"DELETE FROM main.{self.TABLE_NAME} WHERE {' OR '.join(conditions)}", params
+            ).rowcount
+            conn.commit()
+            # New rows get MAX(rowid) + 1, so track what the delete left behind
+            high_water = conn.execute(max_rowid).fetchone()[0]
+        finally:
+            conn.close()
+            self.invalidate_count(cookie_path)
+
+        if deleted:
+            self.logger.info(f"Policy removed {deleted} cookies")
+        return deleted, high_water
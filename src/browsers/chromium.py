@@ -0,0 +1,118 @@
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from ..utils.system import any_process_running
+from .base import BrowserBase, CleanResult, ProgressCallback
+from .profiles import Profile, chromium_cache_paths, default_profile, discover_chromium_profiles
+
+# Seconds between 1601-01-01, Chromium's time origin, and the Unix epoch
+WINDOWS_EPOCH_OFFSET = 11644473600
+
+def _platform_key() -> str:
+    return "linux" if sys.platform.startswith("linux") else sys.platform
+
+class ChromiumBrowser(BrowserBase):
+    """Cookie schema, profile layout and cleaning shared by Chromium-based browsers.
+
+    Subclasses set NAME, DISPLAY_NAME, PROCESS_NAMES and their folders per
+    platform ("win32", "darwin", "linux") relative to the home directory.
+    """
+
+    TABLE_NAME = "cookies"
+    COUNT_QUERY = f"SELECT COUNT(*) FROM {TABLE_NAME}"
+    HOST_COLUMN = "host_key"
+    EXPIRY_COLUMN = "expires_utc"
+    # expires_utc counts microseconds since 1601-01-01; 0 marks a session cookie.
+    EXPIRED_CONDITION = (
+        f"expires_utc BETWEEN 1 AND "
+        f"(CAST(strftime('%s', 'now') AS INTEGER) + {WINDOWS_EPOCH_OFFSET}) * 1000000 - 1"
+    )
+    EXPIRY_UNIX = f"expires_utc / 1000000 - {WINDOWS_EPOCH_OFFSET}"
+    # Chromium keeps the value encrypted in encrypted_value
+    VALUE_BYTES = "length(CAST(value AS BLOB)) + length(encrypted_value)"
+
+    # User data directory (holding "Local State") per platform
+    DATA_DIRS: Dict[str, str] = {}
+    # Disk cache folder kept outside the profile, where the platform does that
+    OS_CACHE_DIRS: Dict[str, str] = {}
+
+    def get_data_dir(self) -> Optional[Path]:
+        """Get the user data directory based on operating system"""
+        data_dir = self.DATA_DIRS.get(_platform_key())
+        if data_dir is None:
+            self.logger.error(f"Unsupported operating system: {sys.platform}")
+            return None
+        return self.get_home() / data_dir
+
+    def get_os_cache_dir(self) -> Optional[Path]:
+        """Get the folder where the OS keeps the disk cache, if separate"""
+        cache_dir = self.OS_CACHE_DIRS.get(_platform_key())
+        return self.get_home() / cache_dir if cache_dir else None
+
+    def get_profiles(self) -> List[Profile]:
+        """Get all profiles listed in Local State or found on disk"""
+        user_data_dir = self.get_data_dir()
+        return discover_chromium_profiles(user_data_dir) if user_data_dir else []
+
+    def get_profile_cache_paths(self, profile: Profile) -> List[Path]:
+        """Get the cache folders for profile"""
+        return chromium_cache_paths(profile, self.get_os_cache_dir())
+
+    def get_cookie_path(self) -> Optional[Path]:
+        """Get the cookie path for the bound or default profile"""
+        if self.profile:
+            return self.profile.cookie_path
+        user_data_dir = self.get_data_dir()
+        if not user_data_dir:
+            return None
+        profile = default_profile(self.get_profiles())
+        if profile and profile.cookie_path:
+            return profile.cookie_path
+        return user_data_dir / "Default/Cookies"
+
+    def is_running(self) -> bool:
+        """Check for the browser's processes"""
+        try:
+            # A single shared snapshot answers every name, instead of one
+            # process table walk (plus `ps aux` on macOS) per name
+            proc = any_process_running(self.PROCESS_NAMES, self.get_owner())
+            if proc:
+                self.logger.info(f"Found running {self.DISPLAY_NAME} process: {proc}")
+                return True
+            return False
+
+        except Exception as e:
+            self.logger.error(f"Error checking {self.DISPLAY_NAME} processes: {str(e)}")
+            return True  # Fail safe: assume running if check fails
+
+    def _before_clean(self) -> None:
+        """Hook run once the browser is closed and before cookies are deleted"""
+
+    def clean_cookies(self, include: Optional[Iterable[str]] = None,
+                      exclude: Optional[Iterable[str]] = None,
+                      compact: bool = False,
+                      chunk_size: Optional[int] = None,
+                      progress: Optional[ProgressCallback] = None,
+                      cancel: Optional[threading.Event] = None) -> CleanResult:
+        """Clean cookies, once ``ensure_closed`` reports the browser closed"""
+        try:
+            if not self.ensure_closed():
+                raise RuntimeError(f"{self.DISPLAY_NAME} is running")
+
+            self._before_clean()
+
+            cookie_path = self.get_cookie_path()
+            if not cookie_path or not cookie_path.exists():
+                raise FileNotFoundError("Cookie file not found")
+
+            with self._span("clean") as s:
+                result = self._clean_database(
+                    cookie_path, include, exclude, compact, chunk_size, progress, cancel
+                )
+                s.rows = result.initial - result.final
+            return result
+
+        except Exception as e:
+            self.logger.error(f"Error cleaning {self.DISPLAY_NAME} cookies: {str(e)}")
+            return CleanResult(False, 0, 0)
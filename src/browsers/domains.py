@@ -0,0 +1,72 @@
+"""Domain pattern helpers shared by the browser implementations."""
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+def parse_domain_pattern(pattern: str) -> Tuple[str, bool]:
+    """Split a domain pattern into (domain, include_subdomains).
+
+    ``example.com`` matches that host only (with or without the leading dot
+    browsers use for domain cookies), while ``.example.com`` and
+    ``*.example.com`` also match every subdomain.
+    """
+    pattern = pattern.strip().lower()
+    subdomains = pattern.startswith(('.', '*.'))
+    return pattern.lstrip('*').strip('.'), subdomains
+
+def parse_domain_patterns(patterns: Iterable[str]) -> List[Tuple[str, bool]]:
+    """Parse several patterns, skipping blank ones"""
+    parsed = (parse_domain_pattern(p) for p in patterns)
+    return [p for p in parsed if p[0]]
+
+# Multi-label public suffixes common enough to matter for grouping. This is
+# deliberately not the full Public Suffix List: hosts under an unlisted
+# suffix fall back to their last two labels.
+MULTI_LABEL_SUFFIXES = frozenset({
+    "co.uk", "org.uk", "ac.uk", "gov.uk", "me.uk", "net.uk", "ltd.uk", "plc.uk",
+    "com.au", "net.au", "org.au", "edu.au", "gov.au",
+    "co.nz", "org.nz", "net.nz", "co.jp", "ne.jp", "or.jp", "ac.jp", "go.jp",
+    "co.kr", "or.kr", "co.in", "net.in", "org.in", "co.za", "co.il", "co.id",
+    "com.br", "net.br", "org.br", "com.cn", "net.cn", "org.cn", "com.hk", "com.tw",
+    "com.mx", "com.ar", "com.tr", "com.sg", "com.my", "com.ph", "com.vn", "com.ua",
+    "com.pl", "com.es", "com.co", "com.pe", "com.sa", "com.eg",
+    "github.io", "gitlab.io", "blogspot.com", "herokuapp.com", "appspot.com",
+    "cloudfront.net", "azurewebsites.net", "netlify.app", "vercel.app", "pages.dev",
+})
+
+def registrable_domain(host: str) -> str:
+    """Approximate the eTLD+1 of a cookie host, e.g. ``.mail.example.co.uk``
+    gives ``example.co.uk``. IP addresses and single labels are returned as is.
+    """
+    host = (host or "").strip().lower().strip(".")
+    labels = host.split(".")
+    if len(labels) <= 2 or labels[-1].isdigit() or ":" in host:
+        return host
+    keep = 3 if ".".join(labels[-2:]) in MULTI_LABEL_SUFFIXES else 2
+    return ".".join(labels[-keep:])
+
+class DomainSummary(NamedTuple):
+    """Aggregate of the cookies stored for one host or site"""
+    domain: str
+    cookies: int
+    value_bytes: int
+    # Unix seconds, None when every cookie is a session cookie
+    earliest_expiry: Optional[int]
+    latest_expiry: Optional[int]
+
+def merge_summaries(summaries: Iterable[Iterable[DomainSummary]],
+                    limit: Optional[int] = None) -> List[DomainSummary]:
+    """Combine summaries of several profiles, busiest domains first"""
+    merged = {}
+    for summary in summaries:
+        for row in summary:
+            current = merged.get(row.domain)
+            if current is None:
+                merged[row.domain] = row
+                continue
+            expiries = [e for e in (current.earliest_expiry, row.earliest_expiry) if e is not None]
+            latest = [e for e in (current.latest_expiry, row.latest_expiry) if e is not None]
+            merged[row.domain] = DomainSummary(
+                row.domain, current.cookies + row.cookies, current.value_bytes + row.value_bytes,
+                min(expiries) if expiries else None, max(latest) if latest else None,
+            )
+    rows = sorted(merged.values(), key=lambda r: (-r.cookies, r.domain))
+    return rows[:limit] if limit is not None else rows
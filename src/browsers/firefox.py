@@ -1,74 +1,85 @@
 import sys
-import sqlite3
-import shutil
-from datetime import datetime
+import threading
 from pathlib import Path
-from typing import List, Tuple, Optional
-from ..utils.system import is_process_running
-from .base import BrowserBase
+from typing import Iterable, List, Optional
+from ..utils.system import any_process_running
+from .base import BrowserBase, CleanResult, ProgressCallback
+from .profiles import Profile, default_profile, discover_firefox_profiles
 
 class FirefoxBrowser(BrowserBase):
     """Firefox browser cookie management implementation"""
     
+    NAME = "firefox"
+    DISPLAY_NAME = "Firefox"
     TABLE_NAME = "moz_cookies"
     COUNT_QUERY = f"SELECT COUNT(*) FROM {TABLE_NAME}"
-    SELECT_QUERY = """
-        SELECT host, name, path, value, expiry 
-        FROM moz_cookies 
-        ORDER BY host LIMIT 100
-    """
+    HOST_COLUMN = "host"
+    EXPIRY_COLUMN = "expiry"
+    # expiry is in Unix seconds; 0 marks a session cookie.
+    EXPIRED_CONDITION = (
+        "expiry BETWEEN 1 AND CAST(strftime('%s', 'now') AS INTEGER) - 1"
+    )
+    EXPIRY_UNIX = "expiry"
+    VALUE_BYTES = "length(CAST(value AS BLOB))"
 
     PROCESS_NAME = "firefox"
+    PROCESS_NAMES = [PROCESS_NAME]
 
-    def get_cookie_path(self) -> Optional[Path]:
-        """Get Firefox cookie path based on operating system"""
-        home = Path.home()
+    def get_data_dir(self) -> Optional[Path]:
+        """Get the folder holding profiles.ini based on operating system"""
+        home = self.get_home()
         if sys.platform == "win32":
-            base_path = home / "AppData/Roaming/Mozilla/Firefox/Profiles"
+            return home / "AppData/Roaming/Mozilla/Firefox"
         elif sys.platform == "darwin":
-            base_path = home / "Library/Application Support/Firefox/Profiles"
+            return home / "Library/Application Support/Firefox"
         elif sys.platform.startswith("linux"):
-            base_path = home / ".mozilla/firefox"
+            return home / ".mozilla/firefox"
         else:
             self.logger.error(f"Unsupported operating system: {sys.platform}")
             return None
 
-        try:
-            # Find default profile
-            for folder in base_path.iterdir():
-                if folder.name.endswith('.default-release'):
-                    return folder / 'cookies.sqlite'
-            return None
-        except Exception as e:
-            self.logger.error(f"Error finding Firefox profile: {str(e)}")
-            return None
-
-    def get_cookie_details(self) -> List[Tuple]:
-        """Retrieve cookie details from Firefox's database"""
-        try:
-            cookie_path = self.get_cookie_path()
-            if not cookie_path or not cookie_path.exists():
-                return []
-
-            # Create temporary copy to avoid locks
-            temp_db = cookie_path.parent / 'cookies_temp.sqlite'
-            shutil.copy2(cookie_path, temp_db)
+    def get_profiles(self) -> List[Profile]:
+        """Get all Firefox profiles registered in profiles.ini"""
+        root = self.get_data_dir()
+        return discover_firefox_profiles(root) if root else []
 
-            conn = sqlite3.connect(str(temp_db))
-            c = conn.cursor()
-            c.execute(self.SELECT_QUERY)
-            cookies = c.fetchall()
-            conn.close()
+    def get_local_profiles_dir(self) -> Optional[Path]:
+        """Get the folder holding the local (cache) half of each profile"""
+        home = self.get_home()
+        if sys.platform == "win32":
+            return home / "AppData/Local/Mozilla/Firefox/Profiles"
+        elif sys.platform == "darwin":
+            return home / "Library/Caches/Firefox/Profiles"
+        elif sys.platform.startswith("linux"):
+            return home / ".cache/mozilla/firefox"
+        return None
 
-            temp_db.unlink(missing_ok=True)
-            return cookies
+    def get_profile_cache_paths(self, profile: Profile) -> List[Path]:
+        """Get Firefox cache2 folders for profile"""
+        paths = [profile.path / "cache2"]
+        local_dir = self.get_local_profiles_dir()
+        if local_dir:
+            paths.append(local_dir / profile.path.name / "cache2")
+        return paths
 
+    def get_cookie_path(self) -> Optional[Path]:
+        """Get Firefox cookie path for the bound or default profile"""
+        if self.profile:
+            return self.profile.cookie_path
+        try:
+            profile = default_profile(self.get_profiles())
+            return profile.cookie_path if profile else None
         except Exception as e:
-            self.logger.error(f"Error reading cookies: {str(e)}")
-            return []
+            self.logger.error(f"Error finding Firefox profile: {str(e)}")
+            return None
 
-    def clean_cookies(self) -> Tuple[bool, int, int]:
-        """Clean all Firefox cookies"""
+    def clean_cookies(self, include: Optional[Iterable[str]] = None,
+                      exclude: Optional[Iterable[str]] = None,
+                      compact: bool = False,
+                      chunk_size: Optional[int] = None,
+                      progress: Optional[ProgressCallback] = None,
+                      cancel: Optional[threading.Event] = None) -> CleanResult:
+        """Clean Firefox cookies"""
         try:
             if self.is_running():
                 raise RuntimeError("Firefox is running")
@@ -77,25 +88,17 @@ class FirefoxBrowser(BrowserBase):
             if not cookie_path or not cookie_path.exists():
                 raise FileNotFoundError("Cookie file not found")
 
-            # Create backup
-            backup_path = cookie_path.parent / f"cookies.sqlite.backup_{datetime.now():%Y%m%d_%H%M%S}"
-            shutil.copy2(cookie_path, backup_path)
-
-            initial_count = self.get_cookie_count()
-
-            conn = sqlite3.connect(str(cookie_path))
-            c = conn.cursor()
-            c.execute(f"DELETE FROM {self.TABLE_NAME}")
-            conn.commit()
-            conn.close()
-
-            final_count = self.get_cookie_count()
-            return True, initial_count, final_count
+            with self._span("clean") as s:
+                result = self._clean_database(
+                    cookie_path, include, exclude, compact, chunk_size, progress, cancel
+                )
+                s.rows = result.initial - result.final
+            return result
 
         except Exception as e:
             self.logger.error(f"Error cleaning cookies: {str(e)}")
-            return False, 0, 0
+            return CleanResult(False, 0, 0)
 
     def is_running(self) -> bool:
-        """Check if Chrome is running"""
-        return is_process_running(self.PROCESS_NAME)
\ No newline at end of file
+        """Check if Firefox is running"""
+        return any_process_running(self.PROCESS_NAMES, self.get_owner()) is not None
\ No newline at end of file
@@ -0,0 +1,175 @@
+"""Browser profile discovery with a stat-keyed cache."""
+import configparser
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class Profile(NamedTuple):
+    """A single browser profile and its cookie database"""
+    name: str
+    display_name: str
+    path: Path
+    cookie_path: Optional[Path]
+    is_default: bool = False
+
+_cache: Dict[Tuple[str, Path], Tuple[tuple, List[Profile], List[tuple]]] = {}
+_cache_lock = threading.Lock()
+
+def _mtime(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def _profile_signature(profile: Profile) -> tuple:
+    # Creating a cookie DB touches the profile dir (or Network/ for Chromium)
+    return (_mtime(profile.path), _mtime(profile.path / "Network"))
+
+def _cached(kind: str, root: Path, index_file: Path, discover) -> List[Profile]:
+    """Return discover(root), reusing the last result while nothing changed.
+
+    The cache is keyed on the mtimes of the profile root (profiles added or
+    removed), the browser's profile index file and each known profile
+    directory (cookie databases created or removed).
+    """
+    signature = (_mtime(root), _mtime(index_file))
+    key = (kind, root)
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached and cached[0] == signature and \
+            [_profile_signature(p) for p in cached[1]] == cached[2]:
+        return cached[1]
+
+    profiles = discover(root) if signature[0] is not None else []
+    with _cache_lock:
+        _cache[key] = (signature, profiles, [_profile_signature(p) for p in profiles])
+    return profiles
+
+def chromium_cookie_path(profile_dir: Path) -> Optional[Path]:
+    """Locate a Chromium profile's cookie DB, preferring Network/Cookies"""
+    for candidate in (profile_dir / "Network" / "Cookies", profile_dir / "Cookies"):
+        if candidate.exists():
+            return candidate
+    return None
+
+# Per-profile cache folders, relative to the profile or the OS cache root
+CHROMIUM_PROFILE_CACHE_DIRS = ["Cache", "Code Cache", "GPUCache",
+                               "Service Worker/CacheStorage", "Service Worker/ScriptCache"]
+CHROMIUM_OS_CACHE_DIRS = ["Cache", "Code Cache"]
+
+def chromium_cache_paths(profile: Profile, cache_root: Optional[Path]) -> List[Path]:
+    """Cache folders of a Chromium profile, including those under the OS cache root"""
+    paths = [profile.path / d for d in CHROMIUM_PROFILE_CACHE_DIRS]
+    if cache_root:
+        paths.extend(cache_root / profile.name / d for d in CHROMIUM_OS_CACHE_DIRS)
+    return paths
+
+def _discover_chromium(user_data_dir: Path) -> List[Profile]:
+    info_cache = {}
+    last_used = "Default"
+    try:
+        with open(user_data_dir / "Local State", encoding="utf-8") as f:
+            state = json.load(f).get("profile", {})
+        info_cache = state.get("info_cache", {})
+        last_used = state.get("last_used") or last_used
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.error(f"Error reading Local State in {user_data_dir}: {str(e)}")
+
+    # Local State can lag behind, so also pick up profile folders on disk
+    names = set(info_cache)
+    try:
+        for entry in os.scandir(user_data_dir):
+            if entry.is_dir() and (entry.name == "Default" or entry.name.startswith("Profile ")):
+                names.add(entry.name)
+    except OSError as e:
+        logger.error(f"Error scanning {user_data_dir}: {str(e)}")
+
+    profiles = []
+    for name in sorted(names):
+        profile_dir = user_data_dir / name
+        if not profile_dir.is_dir():
+            continue
+        profiles.append(Profile(
+            name=name,
+            display_name=info_cache.get(name, {}).get("name", name),
+            path=profile_dir,
+            cookie_path=chromium_cookie_path(profile_dir),
+            is_default=name == last_used,
+        ))
+    return profiles
+
+def discover_chromium_profiles(user_data_dir: Path) -> List[Profile]:
+    """List the profiles of a Chrome/Edge user data directory"""
+    return _cached("chromium", user_data_dir, user_data_dir / "Local State", _discover_chromium)
+
+def _discover_firefox(root: Path) -> List[Profile]:
+    parser = configparser.ConfigParser(interpolation=None)
+    try:
+        parser.read(root / "profiles.ini", encoding="utf-8")
+    except configparser.Error as e:
+        logger.error(f"Error reading profiles.ini in {root}: {str(e)}")
+
+    # Newer releases record the default per installation in [Install*]
+    install_defaults = {
+        parser[section].get("Default")
+        for section in parser.sections() if section.startswith("Install")
+    }
+
+    profiles = []
+    for section in parser.sections():
+        if not section.startswith("Profile"):
+            continue
+        entry = parser[section]
+        rel_path = entry.get("Path")
+        if not rel_path:
+            continue
+        is_relative = entry.get("IsRelative", "1") == "1"
+        profile_dir = root / rel_path if is_relative else Path(rel_path)
+        cookie_path = profile_dir / "cookies.sqlite"
+        profiles.append(Profile(
+            name=profile_dir.name,
+            display_name=entry.get("Name", profile_dir.name),
+            path=profile_dir,
+            cookie_path=cookie_path if cookie_path.exists() else None,
+            is_default=rel_path in install_defaults or (
+                not install_defaults and entry.get("Default") == "1"),
+        ))
+
+    if not profiles:
+        # No usable profiles.ini: fall back to any folder holding cookies
+        for folder in (root, root / "Profiles"):
+            try:
+                for entry in os.scandir(folder):
+                    cookie_path = Path(entry.path) / "cookies.sqlite"
+                    if entry.is_dir() and cookie_path.exists():
+                        profiles.append(Profile(
+                            name=entry.name,
+                            display_name=entry.name,
+                            path=Path(entry.path),
+                            cookie_path=cookie_path,
+                            is_default=entry.name.endswith(".default-release"),
+                        ))
+            except OSError:
+                continue
+    return profiles
+
+def discover_firefox_profiles(root: Path) -> List[Profile]:
+    """List the profiles registered in a Firefox profiles.ini"""
+    return _cached("firefox", root, root / "profiles.ini", _discover_firefox)
+
+def default_profile(profiles: List[Profile]) -> Optional[Profile]:
+    """Pick the default profile, falling back to the first with cookies"""
+    for profile in profiles:
+        if profile.is_default:
+            return profile
+    for profile in profiles:
+        if profile.cookie_path:
+            return profile
+    return None
@@ -0,0 +1,92 @@
+"""In-memory host search across every browser profile.
+
+Each profile's distinct hosts are kept twice, sorted as written and sorted
+reversed, so both "starts with" (``mail.goo``) and "ends with"
+(``google.com`` for ``www.google.com``) lookups are a pair of bisections
+instead of a scan. A profile is only re-read when the stat signature of its
+cookie database changed.
+"""
+import threading
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .base import BrowserBase
+
+# Sorts after any character that can appear in a host name
+_HIGH = "\uffff"
+
+class HostMatch(NamedTuple):
+    """A host of one profile matching a search"""
+    source: str
+    host: str
+    cookies: int
+
+class _SourceIndex(NamedTuple):
+    signature: Optional[tuple]
+    hosts: List[str]
+    reversed_hosts: List[str]
+    counts: Dict[str, int]
+
+def _prefix_range(items: List[str], prefix: str, limit: int) -> List[str]:
+    start = bisect_left(items, prefix)
+    end = bisect_left(items, prefix + _HIGH, start)
+    return items[start:min(end, start + limit)]
+
+class HostIndex:
+    """Prefix/suffix host search over (label, browser) sources"""
+
+    def __init__(self, sources: Iterable[Tuple[str, BrowserBase]]):
+        self._sources = list(sources)
+        # Keyed by position, as labels built from display names may repeat
+        self._indexes: Dict[int, Tuple[str, _SourceIndex]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _signature(browser: BrowserBase) -> Optional[tuple]:
+        cookie_path = browser.get_cookie_path()
+        return BrowserBase._stat_signature(Path(cookie_path)) if cookie_path else None
+
+    def stale(self) -> List[str]:
+        """Labels of the sources whose database changed since they were indexed"""
+        with self._lock:
+            indexes = dict(self._indexes)
+        return [label for i, (label, browser) in enumerate(self._sources)
+                if i not in indexes or indexes[i][1].signature != self._signature(browser)]
+
+    def refresh(self) -> int:
+        """Re-index the stale sources; returns how many were rebuilt"""
+        with self._lock:
+            indexes = dict(self._indexes)
+        rebuilt = 0
+        for i, (label, browser) in enumerate(self._sources):
+            signature = self._signature(browser)
+            if i in indexes and indexes[i][1].signature == signature:
+                continue
+            counts = {row.domain: row.cookies for row in browser.summarize_domains()}
+            index = _SourceIndex(signature, sorted(counts),
+                                 sorted(host[::-1] for host in counts), counts)
+            with self._lock:
+                self._indexes[i] = (label, index)
+            rebuilt += 1
+        return rebuilt
+
+    def search(self, query: str, limit: int = 500) -> List[HostMatch]:
+        """Hosts starting or ending with query, at most limit per source.
+
+        A leading dot or ``*.`` in query is ignored, as cookie hosts are
+        indexed without the leading dot of domain cookies.
+        """
+        query = query.strip().lower().lstrip("*").lstrip(".")
+        if not query:
+            return []
+        with self._lock:
+            indexes = list(self._indexes.values())
+
+        matches = []
+        for label, index in indexes:
+            hosts = set(_prefix_range(index.hosts, query, limit))
+            hosts.update(h[::-1] for h in _prefix_range(index.reversed_hosts, query[::-1], limit))
+            matches.extend(HostMatch(label, host, index.counts[host]) for host in hosts)
+        matches.sort(key=lambda m: (m.host, m.source))
+        return matches
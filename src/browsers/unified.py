@@ -0,0 +1,179 @@
+"""One SQLite session over the cookie databases of every browser.
+
+Each profile's database is ATTACHed read-only (``mode=ro``) to an in-memory
+connection, and a temporary ``all_cookies`` view puts them side by side::
+
+    browser | profile | host | name | path | expiry
+
+with expiry normalized to Unix seconds (NULL for session cookies), so
+cross-browser counts, joins and summaries are a single SQL statement
+instead of one query per browser merged in Python.
+
+SQLite caps how many databases one connection may attach (10 by default).
+With more profiles than that, the projected rows are copied into a
+temporary ``all_cookies`` table instead, attaching and detaching the
+databases a batch at a time; queries see the same columns either way.
+"""
+import logging
+import sqlite3
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .base import BrowserBase
+from .domains import registrable_domain
+
+logger = logging.getLogger(__name__)
+
+VIEW_NAME = "all_cookies"
+
+# SQLite's compiled-in default when the limit cannot be queried
+DEFAULT_MAX_ATTACHED = 10
+
+class SiteCookies(NamedTuple):
+    """Cookies of one domain across browsers"""
+    domain: str
+    browsers: Tuple[str, ...]
+    profiles: int
+    cookies: int
+
+def _quote(text: str) -> str:
+    return "'" + text.replace("'", "''") + "'"
+
+class UnifiedCookies:
+    """Read-only ``all_cookies`` view over (browser name, browser) sources.
+
+    Every profile of each source with a cookie database is included.
+    """
+
+    def __init__(self, sources: Iterable[Tuple[str, BrowserBase]]):
+        self._sources = list(sources)
+
+    def _databases(self) -> List[Tuple[str, BrowserBase]]:
+        databases = []
+        for name, browser in self._sources:
+            for profile_browser in browser.profile_browsers() or [browser]:
+                cookie_path = profile_browser.get_cookie_path()
+                if cookie_path and cookie_path.exists():
+                    databases.append((name, profile_browser))
+        return databases
+
+    @staticmethod
+    def _attach(conn: sqlite3.Connection, browser: BrowserBase, alias: str) -> None:
+        """Attach browser's database read-only, immutably if the browser holds a lock.
+
+        The lock is probed without waiting, since a running browser keeps it
+        for as long as it is open.
+        """
+        uri = browser.get_cookie_path().resolve().as_uri()
+        conn.execute("PRAGMA busy_timeout=0")
+        try:
+            conn.execute("ATTACH DATABASE ? AS " + alias, (f"{uri}?mode=ro",))
+            conn.execute(f"SELECT 1 FROM {alias}.sqlite_master LIMIT 1").fetchall()
+            return
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            if alias in {row[1] for row in conn.execute("PRAGMA database_list")}:
+                conn.execute(f"DETACH DATABASE {alias}")
+        finally:
+            conn.execute(f"PRAGMA busy_timeout={browser.BUSY_TIMEOUT_MS}")
+        logger.info(f"Cookie database locked, attaching immutable: {uri}")
+        conn.execute("ATTACH DATABASE ? AS " + alias, (f"{uri}?mode=ro&immutable=1",))
+
+    @staticmethod
+    def _select(name: str, browser: BrowserBase, alias: str) -> str:
+        return (f"SELECT {_quote(name)} AS browser, "
+                f"{_quote(browser.get_profile_name())} AS profile, "
+                f"{browser.HOST_COLUMN} AS host, name, path, "
+                f"{browser.expiry_sql()} AS expiry "
+                f"FROM {alias}.{browser.TABLE_NAME}")
+
+    def _copy_batches(self, conn: sqlite3.Connection,
+                      databases: List[Tuple[str, BrowserBase]], batch_size: int) -> None:
+        """Fill a temp all_cookies table, attaching batch_size databases at a time"""
+        conn.execute(f"CREATE TEMP TABLE {VIEW_NAME} "
+                     "(browser TEXT, profile TEXT, host TEXT, name TEXT, path TEXT, expiry INTEGER)")
+        conn.commit()
+        for start in range(0, len(databases), batch_size):
+            attached = []
+            try:
+                for i, (name, browser) in enumerate(databases[start:start + batch_size]):
+                    alias = f"db{i}"
+                    self._attach(conn, browser, alias)
+                    attached.append(alias)
+                    conn.execute(f"INSERT INTO {VIEW_NAME} " + self._select(name, browser, alias))
+                conn.commit()
+            finally:
+                # DETACH is refused inside an open transaction
+                conn.rollback()
+                for alias in attached:
+                    conn.execute(f"DETACH DATABASE {alias}")
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a connection with the all_cookies view (or table) created"""
+        databases = self._databases()
+        conn = sqlite3.connect(":memory:", uri=True)
+        try:
+            getlimit = getattr(conn, "getlimit", None)
+            max_attached = (getlimit(sqlite3.SQLITE_LIMIT_ATTACHED) if getlimit
+                            else DEFAULT_MAX_ATTACHED)
+            if len(databases) > max_attached:
+                logger.info(f"{len(databases)} cookie databases exceed the limit of "
+                            f"{max_attached} attached databases, copying in batches")
+                self._copy_batches(conn, databases, max_attached)
+            else:
+                selects = []
+                for i, (name, browser) in enumerate(databases):
+                    alias = f"db{i}"
+                    self._attach(conn, browser, alias)
+                    selects.append(self._select(name, browser, alias))
+                if not selects:
+                    selects.append("SELECT NULL AS browser, NULL AS profile, NULL AS host, "
+                                   "NULL AS name, NULL AS path, NULL AS expiry WHERE 0")
+                conn.execute(f"CREATE TEMP VIEW {VIEW_NAME} AS " + " UNION ALL ".join(selects))
+            conn.create_function("registrable_domain", 1, registrable_domain,
+                                 deterministic=True)
+            return conn
+        except Exception:
+            conn.close()
+            raise
+
+    @contextmanager
+    def open(self) -> Iterator[sqlite3.Connection]:
+        """Context manager yielding a connection from ``connect``"""
+        conn = self.connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Cookie count per browser and profile"""
+        counts: Dict[str, Dict[str, int]] = {}
+        with self.open() as conn:
+            for browser, profile, count in conn.execute(
+                    f"SELECT browser, profile, COUNT(*) FROM {VIEW_NAME} GROUP BY 1, 2"):
+                counts.setdefault(browser, {})[profile] = count
+        return counts
+
+    def sites(self, by_site: bool = False, min_browsers: int = 1,
+              limit: Optional[int] = None) -> List[SiteCookies]:
+        """Domains with cookies in at least min_browsers browsers, busiest first.
+
+        With by_site hosts are folded into their registrable domain.
+        """
+        domain = "registrable_domain(host)" if by_site else "ltrim(lower(host), '.')"
+        query = f"""
+            SELECT domain, group_concat(DISTINCT browser), COUNT(DISTINCT browser || '/' || profile),
+                   SUM(cookies)
+            FROM (
+                SELECT browser, profile, {domain} AS domain, COUNT(*) AS cookies
+                FROM {VIEW_NAME} GROUP BY browser, profile, host
+            )
+            GROUP BY domain HAVING COUNT(DISTINCT browser) >= ?
+            ORDER BY 4 DESC, 1 LIMIT ?
+        """
+        with self.open() as conn:
+            rows = conn.execute(query, (min_browsers, -1 if limit is None else limit)).fetchall()
+        return [SiteCookies(domain, tuple(sorted(browsers.split(","))), profiles, cookies)
+                for domain, browsers, profiles, cookies in rows]
@@ -0,0 +1,420 @@
+"""Headless command line interface.
+
+Drives the browser classes directly and never imports PyQt6 unless the
+``gui`` subcommand is used, so it starts quickly and runs without a display.
+
+    python -m src count
+    python -m src list --browser firefox --limit 50
+    python -m src sites --by-site --min-browsers 2
+    python -m src clean --exclude .corp.example.com --json
+    python -m src verify
+    python -m src watch --block .tracker.example
+    python -m src batch --homes-root /home --workers 8
+"""
+import argparse
+import json
+import logging
+import signal
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from .browsers import BrowserBase, DeleteProgress, browser_names, get_browser, iter_browsers
+from .browsers.base import ProgressCallback
+from .utils.metrics import collect
+
+def _selected_browsers(args) -> Dict[str, BrowserBase]:
+    if not args.browser:
+        return dict(iter_browsers())
+    unknown = set(args.browser) - set(browser_names())
+    if unknown:
+        raise SystemExit(f"Unknown browser: {', '.join(sorted(unknown))}")
+    return {name: get_browser(name) for name in args.browser}
+
+def _profile_browsers(browser: BrowserBase) -> List[BrowserBase]:
+    return browser.profile_browsers() or [browser]
+
+def _emit(args, data, lines: List[str]) -> None:
+    if args.json:
+        json.dump(data, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        for line in lines:
+            print(line)
+
+class _ProgressLine:
+    """Sum the delete progress of all profiles into one stderr status line"""
+
+    def __init__(self, args):
+        self.enabled = not args.json and sys.stderr.isatty()
+        self._sources: Dict[str, DeleteProgress] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, update: DeleteProgress) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._sources[update.source] = update
+            done = sum(p.done for p in self._sources.values())
+            total = sum(p.total for p in self._sources.values())
+            rate = sum(p.rows_per_second for p in self._sources.values() if p.done < p.total)
+            print(f"\r{done}/{total} cookies deleted ({rate:.0f} rows/s)   ",
+                  end="", file=sys.stderr, flush=True)
+
+    @property
+    def callback(self) -> Optional[ProgressCallback]:
+        """This line as a progress callback, or None when it shows nothing,
+        which spares the delete its up-front count"""
+        return self if self.enabled else None
+
+    def finish(self) -> None:
+        if self.enabled and self._sources:
+            print(file=sys.stderr)
+
+@contextmanager
+def _cancel_on_interrupt() -> Iterator[threading.Event]:
+    """Turn Ctrl+C into a cancel token, so deletes stop after the current chunk"""
+    cancel = threading.Event()
+    if threading.current_thread() is not threading.main_thread():
+        yield cancel
+        return
+
+    def interrupt(signum, frame):
+        if cancel.is_set():
+            raise KeyboardInterrupt
+        print("\nStopping after the current chunk (Ctrl+C again to abort)", file=sys.stderr)
+        cancel.set()
+
+    previous = signal.signal(signal.SIGINT, interrupt)
+    try:
+        yield cancel
+    finally:
+        signal.signal(signal.SIGINT, previous)
+
+def _count(args) -> Dict[str, Dict[str, int]]:
+    counts = {}
+    for name, browser in _selected_browsers(args).items():
+        counts[name] = {
+            b.get_profile_name(): b.get_cookie_count() for b in _profile_browsers(browser)
+        }
+    return counts
+
+def cmd_count(args) -> int:
+    counts = _count(args)
+    _emit(args, counts, [
+        f"{name}\t{profile}\t{count}"
+        for name, profiles in counts.items() for profile, count in profiles.items()
+    ])
+    return 0
+
+def cmd_list(args) -> int:
+    remaining = args.limit
+    columns = ("expiry", "value") if args.values else ("expiry",)
+    for name, browser in _selected_browsers(args).items():
+        for profile_browser in _profile_browsers(browser):
+            profile = profile_browser.get_profile_name()
+            # Stream row by row so memory stays flat for any table size
+            for cookie in profile_browser.iter_cookies(columns=columns):
+                if remaining is not None:
+                    if remaining <= 0:
+                        return 0
+                    remaining -= 1
+                if args.json:
+                    entry = {"browser": name, "profile": profile, **cookie._asdict()}
+                    if not args.values:
+                        del entry["value"]
+                    print(json.dumps(entry))
+                else:
+                    print(f"{name}\t{profile}\t{cookie.host}\t{cookie.name}\t{cookie.path}")
+    return 0
+
+def cmd_summary(args) -> int:
+    results = {}
+    for name, browser in _selected_browsers(args).items():
+        results[name] = [row._asdict() for row in
+                         browser.summarize_all_profiles(by_site=args.by_site, limit=args.top)]
+    _emit(args, results, [
+        f"{name}\t{r['domain']}\t{r['cookies']}\t{r['value_bytes']} bytes"
+        for name, rows in results.items() for r in rows
+    ])
+    return 0
+
+def cmd_sites(args) -> int:
+    from .browsers.unified import UnifiedCookies
+
+    sources = _selected_browsers(args).items()
+    try:
+        sites = UnifiedCookies(sources).sites(
+            by_site=args.by_site, min_browsers=args.min_browsers, limit=args.top)
+    except sqlite3.Error as e:
+        print(f"Error reading cookie databases: {e}", file=sys.stderr)
+        return 1
+    rows = [row._asdict() for row in sites]
+    _emit(args, rows, [
+        f"{r['domain']}\t{','.join(r['browsers'])}\t{r['cookies']}" for r in rows
+    ])
+    return 0
+
+def _status(result: dict) -> str:
+    if not result["success"]:
+        return "FAILED"
+    return "cancelled" if result["cancelled"] else "ok"
+
+def _result_row(result) -> dict:
+    return {
+        "success": result.success, "initial": result.initial, "final": result.final,
+        "removed": result.initial - result.final if result.success else 0,
+        "cancelled": result.cancelled,
+    }
+
+def cmd_clean(args) -> int:
+    results = {}
+    failed = False
+    progress = _ProgressLine(args)
+    with _cancel_on_interrupt() as cancel:
+        for name, browser in _selected_browsers(args).items():
+            if cancel.is_set():
+                break
+            results[name] = {}
+            for profile, result in browser.clean_all_profiles(
+                    include=args.include, exclude=args.exclude,
+                    compact=args.compact, force=args.force, chunk_size=args.chunk_size,
+                    progress=progress.callback, cancel=cancel).items():
+                results[name][profile] = _result_row(result)
+                failed = failed or not result.success or result.cancelled
+    progress.finish()
+    _emit(args, results, [
+        f"{name}\t{profile}\t{_status(r)}\t{r['removed']} removed"
+        for name, profiles in results.items() for profile, r in profiles.items()
+    ])
+    return 1 if failed else 0
+
+def cmd_prune(args) -> int:
+    results = {}
+    failed = False
+    progress = _ProgressLine(args)
+    with _cancel_on_interrupt() as cancel:
+        for name, browser in _selected_browsers(args).items():
+            results[name] = {}
+            for profile_browser in _profile_browsers(browser):
+                if cancel.is_set():
+                    break
+                result = profile_browser.prune_expired(
+                    chunk_size=args.chunk_size, progress=progress.callback, cancel=cancel
+                )
+                results[name][profile_browser.get_profile_name()] = _result_row(result)
+                failed = failed or not result.success or result.cancelled
+    progress.finish()
+    _emit(args, results, [
+        f"{name}\t{profile}\t{_status(r)}\t{r['removed']} expired removed"
+        for name, profiles in results.items() for profile, r in profiles.items()
+    ])
+    return 1 if failed else 0
+
+def cmd_cache(args) -> int:
+    results = {}
+    for name, browser in _selected_browsers(args).items():
+        def progress(files, size, name=name):
+            if not args.json:
+                print(f"\r{name}: {files} files, {size / 1048576:.1f} MiB", end="", file=sys.stderr)
+
+        result = browser.clear_cache(progress=progress, max_workers=args.workers)
+        if not args.json:
+            print(file=sys.stderr)
+        results[name] = result._asdict()
+    _emit(args, results, [
+        f"{name}\t{r['files']} files\t{r['bytes']} bytes\t{r['errors']} errors"
+        for name, r in results.items()
+    ])
+    return 0
+
+def cmd_compact(args) -> int:
+    results = {}
+    for name, browser in _selected_browsers(args).items():
+        results[name] = {}
+        for profile_browser in _profile_browsers(browser):
+            if not profile_browser.ensure_closed(args.force):
+                print(f"{name} is running, skipping", file=sys.stderr)
+                break
+            before, after = profile_browser.compact_database(min_gain=args.min_gain)
+            results[name][profile_browser.get_profile_name()] = {"before": before, "after": after}
+    _emit(args, results, [
+        f"{name}\t{profile}\t{r['before']} -> {r['after']} bytes"
+        for name, profiles in results.items() for profile, r in profiles.items()
+    ])
+    return 0
+
+def cmd_verify(args) -> int:
+    counts = _count(args)
+    remaining = sum(c for profiles in counts.values() for c in profiles.values() if c > 0)
+    errors = any(c < 0 for profiles in counts.values() for c in profiles.values())
+    _emit(args, {"counts": counts, "remaining": remaining, "clean": remaining == 0}, [
+        f"{name}\t{profile}\t{count}"
+        for name, profiles in counts.items() for profile, count in profiles.items()
+    ] + [f"remaining\t{remaining}"])
+    return 1 if remaining or errors else 0
+
+def cmd_watch(args) -> int:
+    from .watch import CookieWatch
+
+    watch = CookieWatch(
+        _selected_browsers(args).values(),
+        blocked=args.block,
+        prune_expired=not args.keep_expired,
+        debounce=args.debounce,
+        poll_interval=args.poll_interval,
+    )
+    try:
+        watch.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def cmd_batch(args) -> int:
+    from .batch import clean_homes, find_homes
+
+    unknown = set(args.browser or []) - set(browser_names())
+    if unknown:
+        raise SystemExit(f"Unknown browser: {', '.join(sorted(unknown))}")
+    homes = [Path(h) for h in args.homes] or find_homes(args.homes_root)
+    reports = clean_homes(
+        homes, browsers=args.browser, include=args.include, exclude=args.exclude,
+        compact=args.compact, force=args.force, max_workers=args.workers,
+        io_concurrency=args.io_concurrency, backup_root=args.backup_root,
+    )
+    failed = False
+    lines = []
+    for user, report in reports.items():
+        ok = not report["error"] and all(
+            r["success"] for profiles in report["browsers"].values() for r in profiles.values()
+        )
+        failed = failed or not ok
+        lines.append(f"{user}\t{report['home']}\t{'ok' if ok else 'FAILED'}\t"
+                     f"{report['removed']} removed" + (f"\t{report['error']}" if report["error"] else ""))
+    _emit(args, reports, lines)
+    return 1 if failed else 0
+
+def cmd_gui(args) -> int:
+    # Imported here so every other command stays free of Qt
+    from PyQt6.QtWidgets import QApplication
+    from .gui.app import BrowserCleanerGUI
+    from .utils.logger import setup_logger
+
+    setup_logger()
+    app = QApplication(sys.argv[:1])
+    window = BrowserCleanerGUI()
+    window.show()
+    return app.exec()
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cookie-cleaner", description="Browser Cookie Cleaner")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    parser.add_argument("--browser", action="append",
+                        help="limit to a browser, e.g. chrome (repeatable, default: all installed)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log progress to stderr")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="write per-phase timings to PATH (.prom for a Prometheus textfile, else JSON)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("count", help="count cookies per profile").set_defaults(func=cmd_count)
+
+    list_parser = sub.add_parser("list", help="list cookies")
+    list_parser.add_argument("--limit", type=int, help="stop after this many cookies")
+    list_parser.add_argument("--values", action="store_true",
+                             help="include cookie values in the JSON output")
+    list_parser.set_defaults(func=cmd_list)
+
+    summary_parser = sub.add_parser("summary", help="cookie counts and sizes per domain")
+    summary_parser.add_argument("--by-site", action="store_true",
+                                help="group by registrable domain (eTLD+1) instead of host")
+    summary_parser.add_argument("--top", type=int, default=20, help="number of domains shown")
+    summary_parser.set_defaults(func=cmd_summary)
+
+    sites_parser = sub.add_parser("sites", help="domains with cookies across browsers, in one query")
+    sites_parser.add_argument("--by-site", action="store_true",
+                              help="group hosts by registrable domain (eTLD+1)")
+    sites_parser.add_argument("--min-browsers", type=int, default=1, metavar="N",
+                              help="only domains with cookies in at least N browsers")
+    sites_parser.add_argument("--top", type=int, default=20, help="number of domains shown")
+    sites_parser.set_defaults(func=cmd_sites)
+
+    clean_parser = sub.add_parser("clean", help="clean cookies in every profile")
+    clean_parser.add_argument("--include", action="append", metavar="DOMAIN",
+                              help="only clean matching domains (.example.com includes subdomains)")
+    clean_parser.add_argument("--exclude", action="append", metavar="DOMAIN",
+                              help="keep cookies of matching domains")
+    clean_parser.add_argument("--force", action="store_true",
+                              help="shut down running browsers instead of skipping them")
+    clean_parser.add_argument("--compact", action="store_true",
+                              help="checkpoint and vacuum the databases afterwards")
+    clean_parser.add_argument("--chunk-size", type=int, metavar="ROWS",
+                              help="rows deleted per transaction")
+    clean_parser.set_defaults(func=cmd_clean)
+
+    prune_parser = sub.add_parser("prune", help="remove expired cookies only")
+    prune_parser.add_argument("--chunk-size", "--batch-size", dest="chunk_size", type=int,
+                              metavar="ROWS", help="rows deleted per transaction")
+    prune_parser.set_defaults(func=cmd_prune)
+
+    compact_parser = sub.add_parser("compact", help="shrink cookie databases")
+    compact_parser.add_argument("--min-gain", type=int, metavar="BYTES",
+                                help="only vacuum when at least this much would be freed")
+    compact_parser.add_argument("--force", action="store_true",
+                                help="shut down running browsers instead of skipping them")
+    compact_parser.set_defaults(func=cmd_compact)
+
+    cache_parser = sub.add_parser("cache", help="purge browser caches")
+    cache_parser.add_argument("--workers", type=int, default=8, help="parallel delete threads")
+    cache_parser.set_defaults(func=cmd_cache)
+
+    sub.add_parser("verify", help="exit non-zero if cookies remain").set_defaults(func=cmd_verify)
+
+    batch_parser = sub.add_parser("batch", help="clean the browsers of many users")
+    batch_parser.add_argument("homes", nargs="*", metavar="HOME",
+                              help="home directories to clean (default: every home under --homes-root)")
+    batch_parser.add_argument("--homes-root", type=Path,
+                              help="folder holding the home directories (default: /home, /Users, C:\\Users)")
+    batch_parser.add_argument("--include", action="append", metavar="DOMAIN",
+                              help="only clean matching domains")
+    batch_parser.add_argument("--exclude", action="append", metavar="DOMAIN",
+                              help="keep cookies of matching domains")
+    batch_parser.add_argument("--force", action="store_true",
+                              help="shut down the users' running browsers instead of skipping them")
+    batch_parser.add_argument("--compact", action="store_true",
+                              help="checkpoint and vacuum the databases afterwards")
+    batch_parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    batch_parser.add_argument("--io-concurrency", type=int, default=4,
+                              help="browsers cleaned at the same time across all workers")
+    batch_parser.add_argument("--backup-root", type=Path,
+                              help="keep snapshots in BACKUP_ROOT/<home folder> (default: ~/.cookie_cleaner/backups/users)")
+    batch_parser.set_defaults(func=cmd_batch)
+    watch_parser = sub.add_parser("watch", help="apply a cleaning policy whenever cookies change")
+    watch_parser.add_argument("--block", action="append", metavar="DOMAIN",
+                              help="always remove cookies of matching domains")
+    watch_parser.add_argument("--keep-expired", action="store_true",
+                              help="do not remove expired cookies")
+    watch_parser.add_argument("--debounce", type=float, default=0.5,
+                              help="seconds of quiet before acting on a burst of writes")
+    watch_parser.add_argument("--poll-interval", type=float, default=2.0,
+                              help="polling interval when inotify is unavailable")
+    watch_parser.set_defaults(func=cmd_watch)
+
+    sub.add_parser("gui", help="start the desktop application").set_defaults(func=cmd_gui)
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        stream=sys.stderr
+    )
+    with collect() as metrics:
+        status = args.func(args)
+    metrics.log_summary()
+    if args.metrics:
+        metrics.write(args.metrics)
+    return status
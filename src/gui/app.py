@@ -1,18 +1,31 @@
-from PyQt6.QtWidgets import (QMainWindow, QPushButton, QVBoxLayout, 
-                           QWidget, QLabel, QTextEdit)
-from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import (QMainWindow, QPushButton, QVBoxLayout, QLineEdit,
+                           QWidget, QLabel, QTextEdit, QTableView, QAbstractItemView)
+from PyQt6.QtCore import Qt, QThreadPool
 import logging
-from ..browsers.chrome import ChromeBrowser
-from ..browsers.firefox import FirefoxBrowser
-from ..browsers.edge import EdgeBrowser
+import threading
+from ..browsers import iter_browsers
+from ..browsers.domains import merge_summaries
+from ..browsers.search import HostIndex
+from ..utils.metrics import MetricsCollector, default_metrics_path
+from .models import CookieTableModel, DomainSummaryModel, HostMatchModel
 from .widgets import LoadingWidget, StatusWidget
+from .workers import TaskGroup
 
 class BrowserCleanerGUI(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.chrome = ChromeBrowser()
-        self.firefox = FirefoxBrowser()
-        self.edge = EdgeBrowser()
+        # Only browsers installed on this machine are loaded
+        self.browsers = {browser.DISPLAY_NAME: browser for _, browser in iter_browsers()}
+        # One thread per browser so "Clean All" runs them side by side
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(max(3, QThreadPool.globalInstance().maxThreadCount()))
+        self._task_groups = set()
+        # Cancel tokens of running deletes, set when the window closes
+        self._cancel_tokens = set()
+        self.action_buttons = []
+        # Built on the first search, then refreshed per changed database
+        self.host_index = None
+        self._index_refreshing = False
         self.setup_ui()
 
     def setup_ui(self):
@@ -40,16 +53,6 @@ class BrowserCleanerGUI(QMainWindow):
         layout.addWidget(self.loading_widget)
         self.loading_widget.hide()
 
-    def handle_cleaning_result(self, browser_name, success, initial, final):
-        if success:
-            self.status_widget.show_success(
-                f"{browser_name} cookies cleaned! ({initial} cookies removed)"
-            )
-        else:
-            self.status_widget.show_error(
-            f"Error cleaning {browser_name} cookies!"
-            )
-
     def create_buttons(self, layout):
         """Create and add buttons to layout"""
         # Create clean all button with special styling
@@ -70,24 +73,27 @@ class BrowserCleanerGUI(QMainWindow):
         """)
         clean_all_button.clicked.connect(self.clean_all_browsers)
         layout.addWidget(clean_all_button)
+        self.action_buttons.append(clean_all_button)
         
         # Add spacing between the special button and regular buttons
         layout.addSpacing(20)
         
         # Regular buttons
-        buttons = [
-            ("Show Cookie Details", self.show_cookie_info),
-            ("Clean Chrome Cookies", self.clean_chrome_data),
-            ("Clean Firefox Cookies", self.clean_firefox_data),
-            ("Clean Edge Cookies", self.clean_edge_data),
-            ("Verify Cleaning", self.verify_cleaning)
-        ]
+        buttons = [("Show Cookie Details", self.show_cookie_info),
+                   ("Show Top Domains", self.show_top_domains)]
+        for browser_name in self.browsers:
+            buttons.append((
+                f"Clean {browser_name} Cookies",
+                lambda checked=False, name=browser_name: self.clean_browsers([name])
+            ))
+        buttons.append(("Verify Cleaning", self.verify_cleaning))
 
         for text, slot in buttons:
             button = QPushButton(text)
             button.setMinimumHeight(30)  # Set minimum height for regular buttons
             button.clicked.connect(slot)
             layout.addWidget(button)
+            self.action_buttons.append(button)
 
     def create_labels_and_display(self, layout):
         """Create and add labels and text display to layout"""
@@ -101,160 +107,316 @@ class BrowserCleanerGUI(QMainWindow):
         )
         self.instructions_label.setAlignment(Qt.AlignmentFlag.AlignLeft)
         
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search cookie hosts, e.g. google.com or mail.")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.textChanged.connect(self.search_hosts)
+
         self.status_label = QLabel("Ready")
         self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        # Per-phase timings of the last cleaning run
+        self.metrics_label = QLabel()
+        self.metrics_label.setStyleSheet("font-family: monospace;")
+        self.metrics_label.hide()
         
         self.log_display = QTextEdit()
         self.log_display.setReadOnly(True)
+
+        # Cookie listings go to a lazily populated table instead of the log
+        self.cookie_table = QTableView()
+        self.cookie_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.cookie_table.verticalHeader().setDefaultSectionSize(22)
+        self.cookie_table.horizontalHeader().setStretchLastSection(True)
+        # A third click on a header returns to storage order
+        self.cookie_table.horizontalHeader().setSortIndicatorClearable(True)
+        self.cookie_table.hide()
         
         layout.addWidget(self.instructions_label)
+        layout.addWidget(self.search_box)
         layout.addWidget(self.status_label)
+        layout.addWidget(self.metrics_label)
         layout.addWidget(self.log_display)
+        layout.addWidget(self.cookie_table)
 
-    # Browser-specific methods
-    def display_chrome_data(self):
-        cookies = self.chrome.get_cookie_details()
-        self.display_cookies("Chrome", cookies)
+    # Background task helpers
+    def start_tasks(self, message: str, cancellable: bool = False) -> TaskGroup:
+        """Create a task group whose lifetime drives the loading indicator"""
+        group = TaskGroup(self.thread_pool, self)
+        self._task_groups.add(group)
+        self.status_label.setText(message)
+        self.loading_widget.start(cancellable)
+        for button in self.action_buttons:
+            button.setEnabled(False)
+        group.error.connect(self.handle_task_error)
+        group.finished.connect(lambda: self.finish_tasks(group))
+        return group
 
-    def display_firefox_data(self):
-        cookies = self.firefox.get_cookie_details()
-        self.display_cookies("Firefox", cookies)
+    def finish_tasks(self, group: TaskGroup):
+        """Release a finished task group and restore the UI when idle"""
+        self._task_groups.discard(group)
+        group.deleteLater()
+        if not self._task_groups:
+            self.loading_widget.stop()
+            for button in self.action_buttons:
+                button.setEnabled(True)
 
-    def clean_chrome_data(self):
-        """Clean Chrome cookies with enhanced process handling"""
-        try:
-            self.loading_widget.start()
-        
-            if self.chrome.is_running():
-                self.status_label.setText ("Chrome is running. Attempting to force quit...")
-                if not self.chrome.force_quit_chrome():
-                    self.status_label.setText("Unable to close Chrome. Please close it manually.")
-                    return
+    def handle_task_error(self, key: str, message: str):
+        """Report a failed background task"""
+        self.status_widget.show_error(f"Error in {key}! See log for details.")
 
-            success, initial, final = self.chrome.clean_cookies()
-            self.handle_cleaning_result("Chrome", success, initial, final)
+    def record_metrics(self, group: TaskGroup):
+        """Collect the phase timings of group's tasks and show them once it is done"""
+        metrics = MetricsCollector().start()
 
-        except Exception as e:
-            logging.error(f"Error cleaning Chrome cookies: {str(e)}")
-            self.status_label.setText("Error during cleaning! See log for details.")
-        finally:
-            self.loading_widget.stop()
+        def on_finished():
+            metrics.stop()
+            metrics.log_summary()
+            try:
+                metrics.write(default_metrics_path())
+            except OSError as e:
+                logging.error(f"Error writing metrics: {str(e)}")
+            self.metrics_label.setText(metrics.format_breakdown())
+            self.metrics_label.show()
 
-    def clean_firefox_data(self):
-        success, initial, final = self.firefox.clean_cookies()
-        self.handle_cleaning_result("Firefox", success, initial, final)
+        group.finished.connect(on_finished)
 
-    def display_edge_data(self):
-        """Display Edge cookie data"""
-        cookies = self.edge.get_cookie_details()
-        self.display_cookies("Edge", cookies)
+    def track_delete_progress(self, group: TaskGroup) -> threading.Event:
+        """Show group's delete progress summed over all profiles.
 
-    def clean_edge_data(self):
-        """Clean Edge cookies"""
-        try:
-            if self.edge.is_running():
-                self.status_widget.show_error("Please close Edge before cleaning!")
-                return
+        Returns the cancel token for the group's tasks; the loading widget's
+        Cancel button sets it.
+        """
+        cancel = threading.Event()
+        sources = {}
+
+        def on_progress(key, update):
+            sources[update.source] = update
+            self.loading_widget.set_progress(
+                sum(p.done for p in sources.values()),
+                sum(p.total for p in sources.values()),
+                sum(p.rows_per_second for p in sources.values() if p.done < p.total),
+            )
 
-            success, initial, final = self.edge.clean_cookies()
-            self.handle_cleaning_result("Edge", success, initial, final)
+        def on_finished():
+            self.loading_widget.cancelled.disconnect(cancel.set)
+            self._cancel_tokens.discard(cancel)
 
-        except Exception as e:
-            logging.error(f"Error cleaning Edge cookies: {str(e)}")
-            self.status_widget.show_error("Error during cleaning! See log for details.")
+        self._cancel_tokens.add(cancel)
+        self.loading_widget.cancelled.connect(cancel.set)
+        group.progress.connect(on_progress)
+        group.finished.connect(on_finished)
+        return cancel
+
+    @staticmethod
+    def clean_browser(browser_name, browser, progress=None, cancel=None):
+        """Clean a single browser; runs on a worker thread.
+
+        Returns (success, initial, final, cancelled, message) where message is
+        set when the browser was skipped because it could not be closed.
+        """
+        if cancel is not None and cancel.is_set():
+            return True, 0, 0, True, None
+        if not browser.ensure_closed():
+            return False, 0, 0, False, f"Please close {browser_name} before cleaning!"
+        results = browser.clean_all_profiles(progress=progress, cancel=cancel).values()
+        success = all(result.success for result in results)
+        initial = sum(result.initial for result in results)
+        final = sum(result.final for result in results)
+        cancelled = any(result.cancelled for result in results)
+        return success, initial, final, cancelled, None
+
+    @staticmethod
+    def source_key(browser):
+        """Unique task key for a profile; display names may repeat, folders cannot"""
+        return f"{browser.NAME}/{browser.get_profile_name()}"
+
+    @staticmethod
+    def profile_sources(browser_name, browser):
+        """Expand a browser into (label, browser) pairs, one per profile"""
+        browsers = browser.profile_browsers()
+        if len(browsers) <= 1:
+            return [(browser_name, browsers[0] if browsers else browser)]
+        return [(f"{browser_name} ({b.profile.display_name})", b) for b in browsers]
+
+    def display_browser_data(self, browser_name):
+        """Display a single browser's cookies"""
+        self.display_cookies(self.profile_sources(browser_name, self.browsers[browser_name]))
+
+    def clean_browsers(self, browser_names):
+        """Clean the named browsers in the background"""
+        group = self.start_tasks("Cleaning cookies...", cancellable=True)
+        self.record_metrics(group)
+        cancel = self.track_delete_progress(group)
+
+        def on_result(browser_name, result):
+            success, initial, final, cancelled, message = result
+            if message:
+                self.status_widget.show_error(message)
+            else:
+                self.handle_cleaning_result(browser_name, success, initial, final, cancelled)
+
+        group.result.connect(on_result)
+        for browser_name in browser_names:
+            group.add(browser_name, self.clean_browser, browser_name, self.browsers[browser_name],
+                      report_progress=True, cancel=cancel)
+        group.start()
 
     # Helper methods
-    def display_cookies(self, browser_name, cookies):
-        """Display cookie information in the log"""
-        self.log_display.clear()
-        log_text = f"=== Current {browser_name} Cookies ===\n\n"
-        log_text += f"Total Cookies: {len(cookies)}\n\n"
-        
-        for cookie in cookies:
-            log_text += f"\nHost: {cookie[0]}\n"
-            log_text += f"Cookie Name: {cookie[1]}\n"
-            log_text += f"Path: {cookie[2]}\n"
-            log_text += "-" * 50
-        
-        self.log_display.setText(log_text)
-        self.status_label.setText(f"{browser_name} cookie data displayed")
+    def show_log(self, text):
+        """Show text in the log display in place of the cookie table"""
+        self.cookie_table.hide()
+        self.log_display.setText(text)
+        self.log_display.show()
+
+    def display_cookies(self, browsers):
+        """Show the cookies of the given (name, browser) pairs in the table.
+
+        Rows are only read from the databases as the table is scrolled; the
+        per-browser totals are counted in the background.
+        """
+        self.set_table_model(CookieTableModel(browsers, self.cookie_table, self.thread_pool),
+                             sortable=True)
 
-    def handle_cleaning_result(self, browser_name, success, initial, final):
+        counts = {}
+        group = self.start_tasks("Counting cookies...")
+        group.result.connect(lambda key, count: counts.__setitem__(key, count))
+        group.finished.connect(lambda: self.status_label.setText(", ".join(
+            f"{name} Cookies: {counts.get(self.source_key(browser), 'error')}"
+            for name, browser in browsers
+        )))
+        for _, browser in browsers:
+            group.add(self.source_key(browser), browser.get_cookie_count)
+        group.start()
+
+    def handle_cleaning_result(self, browser_name, success, initial, final, cancelled=False):
         """Handle the result of cookie cleaning"""
-        if success:
-            msg = f"{browser_name} cookies cleaned! ({initial} cookies removed)"
+        if success and cancelled:
+            self.status_label.setText(
+                f"Cleaning {browser_name} cancelled ({initial - final} cookies removed)"
+            )
+            self.display_browser_data(browser_name)
+        elif success:
+            msg = f"{browser_name} cookies cleaned! ({initial - final} cookies removed)"
             self.status_label.setText(msg)
-            if browser_name == "Chrome":
-                self.display_chrome_data()
-            elif browser_name == "Firefox":
-                self.display_firefox_data()
-            else:
-                self.display_edge_data()
+            self.display_browser_data(browser_name)
         else:
             self.status_label.setText(f"Error cleaning {browser_name} cookies!")
 
     def verify_cleaning(self):
         """Verify the cleaning process"""
-        chrome_count = self.chrome.get_cookie_count()
-        firefox_count = self.firefox.get_cookie_count()
-        edge_cookies = self.edge.get_cookie_details()
-        
+        counts = {}
+        group = self.start_tasks("Verifying...")
+        group.result.connect(lambda key, count: counts.__setitem__(key, count))
+        group.finished.connect(lambda: self.display_verification(counts))
+        for browser_name, browser in self.browsers.items():
+            group.add(browser_name, browser.count_all_profiles)
+        group.start()
+
+    def display_verification(self, counts):
+        """Render the cookie counts gathered by verify_cleaning"""
         verification_text = "=== Verification Results ===\n\n"
-        verification_text += f"Chrome Cookies: {chrome_count}\n"
-        verification_text += f"Firefox Cookies: {firefox_count}\n"
-        verification_text += f"Edge Cookies: {len(edge_cookies)}\n\n"
+        for browser_name in self.browsers:
+            verification_text += f"{browser_name} Cookies: {counts.get(browser_name, 'error')}\n"
+        verification_text += "\n"
         verification_text += "To verify:\n"
         verification_text += "1. Try accessing previous websites - you should be logged out\n"
         verification_text += "2. Websites should treat you as a new visitor\n"
         
-        self.log_display.setText(verification_text)
+        self.show_log(verification_text)
         self.status_label.setText("Verification complete")
 
     def show_cookie_info(self):
         """Show detailed cookie information for all browsers"""
-        chrome_cookies = self.chrome.get_cookie_details()
-        firefox_cookies = self.firefox.get_cookie_details()
-        edge_cookies = self.edge.get_cookie_details()
-    
-        info_text = "=== Detailed Cookie Information ===\n\n"
-        info_text += f"Chrome Cookies: {len(chrome_cookies)}\n"
-        info_text += f"Firefox Cookies: {len(firefox_cookies)}\n"
-        info_text += f"Edge Cookies: {len(edge_cookies)}\n\n"
-        
-        info_text += "=== Chrome Cookies ===\n"
-        for i, cookie in enumerate(chrome_cookies, 1):
-            info_text += f"\nCookie #{i}:\n"
-            info_text += f"Host: {cookie[0]}\n"
-            info_text += f"Name: {cookie[1]}\n"
-            info_text += f"Path: {cookie[2]}\n"
-            info_text += "-" * 50 + "\n"
-    
-        info_text += "\n=== Firefox Cookies ===\n"
-        for i, cookie in enumerate(firefox_cookies, 1):
-            info_text += f"\nCookie #{i}:\n"
-            info_text += f"Host: {cookie[0]}\n"
-            info_text += f"Name: {cookie[1]}\n"
-            info_text += f"Path: {cookie[2]}\n"
-            info_text += "-" * 50 + "\n"
-    
-        info_text += "\n=== Edge Cookies ===\n"
-        for i, cookie in enumerate(edge_cookies, 1):
-            info_text += f"\nCookie #{i}:\n"
-            info_text += f"Host: {cookie[0]}\n"
-            info_text += f"Name: {cookie[1]}\n"
-            info_text += f"Path: {cookie[2]}\n"
-            info_text += "-" * 50 + "\n"
-    
-        self.log_display.setText(info_text)
-        self.status_label.setText("Cookie details displayed")
+        sources = []
+        for browser_name, browser in self.browsers.items():
+            sources.extend(self.profile_sources(browser_name, browser))
+        self.display_cookies(sources)
+
+    def search_hosts(self, text):
+        """Show the hosts starting or ending with text, across all browsers"""
+        if not text.strip():
+            return
+        if self.host_index is None:
+            sources = []
+            for browser_name, browser in self.browsers.items():
+                sources.extend(self.profile_sources(browser_name, browser))
+            self.host_index = HostIndex(sources)
+
+        # Answer from what is indexed now and re-run once stale sources are rebuilt
+        if not self._index_refreshing and self.host_index.stale():
+            self._index_refreshing = True
+            group = self.start_tasks("Indexing cookie hosts...")
+            group.finished.connect(self._index_refreshed)
+            group.add("index", self.host_index.refresh)
+            group.start()
+
+        matches = self.host_index.search(text)
+        self.set_table_model(HostMatchModel(matches, self.cookie_table))
+        self.status_label.setText(f"{len(matches)} matching hosts")
+
+    def _index_refreshed(self):
+        self._index_refreshing = False
+        if self.search_box.text().strip():
+            self.search_hosts(self.search_box.text())
+
+    def set_table_model(self, model, sortable=False):
+        """Show model in the cookie table in place of the log display"""
+        old_model = self.cookie_table.model()
+        self.cookie_table.setModel(model)
+        if sortable:
+            # Rows are still being loaded, so no column is shown as sorted
+            # until one is clicked (Qt would otherwise sort by the first)
+            self.cookie_table.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.cookie_table.setSortingEnabled(sortable)
+        if isinstance(old_model, CookieTableModel):
+            old_model.close()
+        if old_model is not None:
+            old_model.deleteLater()
+        self.log_display.hide()
+        self.cookie_table.show()
+
+    TOP_DOMAINS = 50
+
+    def show_top_domains(self):
+        """Show the sites holding the most cookies across all browsers"""
+        summaries = {}
+        group = self.start_tasks("Summarizing cookies...")
+        group.result.connect(lambda key, rows: summaries.__setitem__(key, rows))
+        group.finished.connect(lambda: self.display_top_domains(summaries))
+        for browser_name, browser in self.browsers.items():
+            group.add(browser_name, browser.summarize_all_profiles, by_site=True)
+        group.start()
+
+    def display_top_domains(self, summaries):
+        """Merge the per-browser summaries and show the busiest domains"""
+        browsers_by_domain = {}
+        for browser_name, rows in summaries.items():
+            for row in rows:
+                browsers_by_domain.setdefault(row.domain, set()).add(browser_name)
+        merged = merge_summaries(summaries.values(), self.TOP_DOMAINS)
+
+        # Already ordered busiest first, so not sortable
+        self.set_table_model(DomainSummaryModel(
+            [(row, browsers_by_domain[row.domain]) for row in merged], self.cookie_table
+        ))
+        total = sum(row.cookies for rows in summaries.values() for row in rows)
+        self.status_label.setText(
+            f"Top {len(merged)} of {len(browsers_by_domain)} domains ({total} cookies)"
+        )
 
     def closeEvent(self, event):
         """Handle application closing"""
         try:
-            # Clean up old log files
-            from ..utils.logger import cleanup_old_logs
-            cleanup_old_logs("logs")
-            
+            # Stop in-flight deletes at the next chunk boundary; chunks already
+            # committed stay deleted, so nothing is left half-written
+            for cancel in self._cancel_tokens:
+                cancel.set()
+            model = self.cookie_table.model()
+            if isinstance(model, CookieTableModel):
+                model.close()
+            self.thread_pool.waitForDone()
+
             logging.info("Application closing")
             event.accept()
         except Exception as e:
@@ -262,44 +424,35 @@ class BrowserCleanerGUI(QMainWindow):
             event.accept()
 
     def clean_all_browsers(self):
-        """Clean cookies from all browsers"""
-        try:
-            self.loading_widget.start()
-            
-            # Store results for each browser
-            results = []
-            
-            # Clean Chrome
-            if self.chrome.is_running():
-                self.status_label.setText("Chrome is running. Attempting to force quit...")
-                if not self.chrome.force_quit_chrome():
-                    self.status_label.setText("Unable to close Chrome. Please close it manually.")
-                else:
-                    success, initial, final = self.chrome.clean_cookies()
-                    results.append(("Chrome", success, initial, final))
-            else:
-                success, initial, final = self.chrome.clean_cookies()
-                results.append(("Chrome", success, initial, final))
-                
-            # Clean Firefox
-            if not self.firefox.is_running():
-                success, initial, final = self.firefox.clean_cookies()
-                results.append(("Firefox", success, initial, final))
-            else:
-                self.status_widget.show_error("Please close Firefox before cleaning!")
-                
-            # Clean Edge
-            if not self.edge.is_running():
-                success, initial, final = self.edge.clean_cookies()
-                results.append(("Edge", success, initial, final))
+        """Clean cookies from all browsers in parallel"""
+        results = []
+        group = self.start_tasks("Cleaning all browsers...", cancellable=True)
+        self.record_metrics(group)
+        cancel = self.track_delete_progress(group)
+
+        def on_result(browser_name, result):
+            success, initial, final, cancelled, message = result
+            if message:
+                self.status_widget.show_error(message)
+                return
+            results.append((browser_name, success, initial, final, cancelled))
+            if success and cancelled:
+                self.status_label.setText(f"{browser_name}: cancelled, {initial - final} cookies removed")
+            elif success:
+                self.status_label.setText(f"{browser_name}: {initial - final} cookies removed")
             else:
-                self.status_widget.show_error("Please close Edge before cleaning!")
-            
+                self.status_label.setText(f"Error cleaning {browser_name} cookies!")
+
+        def on_finished():
             # Display results
-            total_cleaned = sum(initial - final for _, success, initial, final in results if success)
-            success_count = sum(1 for result in results if result[1])
+            total_cleaned = sum(initial - final for _, success, initial, final, _ in results if success)
+            success_count = sum(1 for result in results if result[1] and not result[4])
             
-            if success_count > 0:
+            if any(result[4] for result in results):
+                self.status_widget.show_error(
+                    f"Cleaning cancelled after removing {total_cleaned} cookies"
+                )
+            elif success_count > 0:
                 self.status_widget.show_success(
                     f"Cleaned {total_cleaned} cookies from {success_count} browsers!"
                 )
@@ -308,9 +461,10 @@ class BrowserCleanerGUI(QMainWindow):
                 
             # Update display
             self.verify_cleaning()
-            
-        except Exception as e:
-            logging.error(f"Error cleaning all browsers: {str(e)}")
-            self.status_widget.show_error("Error cleaning browsers!")
-        finally:
-            self.loading_widget.stop()
\ No newline at end of file
+
+        group.result.connect(on_result)
+        group.finished.connect(on_finished)
+        for browser_name, browser in self.browsers.items():
+            group.add(browser_name, self.clean_browser, browser_name, browser,
+                      report_progress=True, cancel=cancel)
+        group.start()
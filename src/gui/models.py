@@ -0,0 +1,243 @@
+import threading
+from datetime import datetime
+from operator import itemgetter
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt, QThreadPool
+from .workers import Worker
+
+class SourceReader:
+    """Pages of cookies from a list of (name, browser) sources.
+
+    Each source is read through one connection (or, for a locked database,
+    one in-memory snapshot) from ``connect_cookies``, kept from its first
+    page until its last. Reads run on the pool one at a time while close()
+    comes from the GUI thread, so both hold the lock.
+    """
+
+    def __init__(self, browsers):
+        self.browsers = browsers
+        self._connections = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def read(self, source, after_rowid, limit):
+        """Read up to limit cookies of source after after_rowid"""
+        with self._lock:
+            if self._closed:
+                return []
+            browser = self.browsers[source][1]
+            if source not in self._connections:
+                self._connections[source] = browser.connect_cookies()
+            conn = self._connections[source]
+            cookies = (browser.get_cookie_details(limit, after_rowid, columns=(), conn=conn)
+                       if conn is not None else [])
+            if len(cookies) < limit:
+                # Source read to the end
+                self._release(source)
+            return cookies
+
+    def _release(self, source):
+        conn = self._connections.pop(source, None)
+        if conn is not None:
+            conn.close()
+
+    def close(self):
+        """Close every open connection; later reads return nothing"""
+        with self._lock:
+            self._closed = True
+            for source in list(self._connections):
+                self._release(source)
+
+class CookieTableModel(QAbstractTableModel):
+    """Lazy table of cookies read from one or more browsers.
+
+    Rows are read a page at a time with ``get_cookie_details`` only when
+    the view asks for more (``canFetchMore``/``fetchMore``). The reads run
+    on a thread pool, and the page after the one just shown is read ahead,
+    so scrolling usually inserts rows that are already loaded and the GUI
+    thread never waits on SQLite. Browsers are listed one after another in
+    storage order, and no column counts as sorted until a header is clicked;
+    that sorts what is loaded, and later pages are merged in. Each browser's
+    connection is kept between pages and released by ``close``.
+    """
+
+    HEADERS = ["Browser", "Host", "Name", "Path"]
+    FETCH_SIZE = 500
+
+    def __init__(self, browsers, parent=None, pool=None):
+        super().__init__(parent)
+        self._browsers = list(browsers)
+        self._reader = SourceReader(self._browsers)
+        self._pool = pool or QThreadPool.globalInstance()
+        self._rows = []
+        # Rows in the order they were read, to return to after sorting
+        self._loaded = []
+        self._sort_key = None
+        self._reverse = False
+        # Where the next read starts: browser index and rowid within it
+        self._cursor = (0, 0)
+        self._exhausted = not self._browsers
+        self._pending = None
+        self._worker = None
+        self._requested = False
+
+    @classmethod
+    def read_page(cls, reader, cursor):
+        """Read the page at cursor; returns (rows, next cursor). Runs on the pool"""
+        source, after_rowid = cursor
+        while source < len(reader.browsers):
+            name = reader.browsers[source][0]
+            # Only the displayed columns are read
+            cookies = reader.read(source, after_rowid, cls.FETCH_SIZE)
+            if len(cookies) < cls.FETCH_SIZE:
+                next_cursor = (source + 1, 0)
+            else:
+                next_cursor = (source, cookies[-1].rowid)
+            if cookies:
+                return [(name, c.host, c.name, c.path) for c in cookies], next_cursor
+            source, after_rowid = next_cursor
+        return [], (source, 0)
+
+    def _start_read(self):
+        if self._worker is not None or self._exhausted:
+            return
+        self._worker = Worker("cookies", self.read_page, self._reader, self._cursor)
+        self._worker.signals.result.connect(self._page_read)
+        self._worker.signals.error.connect(self._read_failed)
+        self._pool.start(self._worker)
+
+    def _page_read(self, key, result):
+        rows, self._cursor = result
+        self._worker = None
+        self._exhausted = self._cursor[0] >= len(self._browsers)
+        self._pending = rows or None
+        if self._requested:
+            self._requested = False
+            self._insert_pending()
+
+    def _read_failed(self, key, message):
+        self._worker = None
+        self._exhausted = True
+
+    def _insert_pending(self):
+        """Show the page read ahead and start reading the one after it"""
+        batch, self._pending = self._pending, None
+        self._start_read()
+        if not batch:
+            return
+        self._loaded.extend(batch)
+        if self._sort_key is None:
+            start = len(self._rows)
+            self.beginInsertRows(QModelIndex(), start, start + len(batch) - 1)
+            self._rows.extend(batch)
+            self.endInsertRows()
+        else:
+            # Keep a user-chosen order; the list is already mostly sorted
+            self.layoutAboutToBeChanged.emit()
+            self._rows.extend(batch)
+            self._rows.sort(key=self._sort_key, reverse=self._reverse)
+            self.layoutChanged.emit()
+
+    def close(self):
+        """Stop reading and release the connections; call when the model is replaced"""
+        self._exhausted = True
+        self._pending = None
+        self._reader.close()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return self._rows[index.row()][index.column()]
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return section + 1
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and (self._pending is not None or not self._exhausted)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        if self._pending is not None:
+            self._insert_pending()
+        else:
+            # Inserted by _page_read once the read in flight arrives
+            self._requested = True
+            self._start_read()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """Sort the loaded rows; rows fetched later are merged into that order.
+
+        A negative column clears the sort and returns to storage order.
+        """
+        if column < 0 and self._sort_key is None:
+            return
+        self.layoutAboutToBeChanged.emit()
+        if column < 0:
+            self._sort_key = None
+            self._rows = list(self._loaded)
+        else:
+            self._sort_key = itemgetter(column)
+            self._reverse = order == Qt.SortOrder.DescendingOrder
+            self._rows.sort(key=self._sort_key, reverse=self._reverse)
+        self.layoutChanged.emit()
+
+class StaticTableModel(QAbstractTableModel):
+    """Read-only table over a fully loaded list of row tuples"""
+
+    HEADERS = []
+
+    def __init__(self, rows, parent=None):
+        super().__init__(parent)
+        self._rows = list(rows)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return self._rows[index.row()][index.column()]
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return section + 1
+
+class DomainSummaryModel(StaticTableModel):
+    """Per-domain cookie summaries merged across browsers.
+
+    rows holds (DomainSummary, browser names) pairs, busiest domain first.
+    """
+
+    HEADERS = ["Domain", "Cookies", "Value Bytes", "Earliest Expiry", "Latest Expiry", "Browsers"]
+
+    def __init__(self, rows, parent=None):
+        super().__init__((self._display(summary, browsers) for summary, browsers in rows), parent)
+
+    @staticmethod
+    def _display(summary, browsers):
+        def expiry(value):
+            return datetime.fromtimestamp(value).strftime("%Y-%m-%d") if value else "session"
+        return (summary.domain, summary.cookies, summary.value_bytes,
+                expiry(summary.earliest_expiry), expiry(summary.latest_expiry),
+                ", ".join(sorted(browsers)))
+
+class HostMatchModel(StaticTableModel):
+    """Hosts found by a HostIndex search"""
+
+    HEADERS = ["Browser", "Host", "Cookies"]
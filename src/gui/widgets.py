@@ -1,8 +1,10 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QProgressBar
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QProgressBar, QPushButton
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 
 class LoadingWidget(QWidget):
     """Widget to show loading status"""
+    cancelled = pyqtSignal()
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setup_ui()
@@ -19,11 +21,32 @@ class LoadingWidget(QWidget):
         self.progress = QProgressBar()
         self.progress.setRange(0, 0)  # Infinite progress
         layout.addWidget(self.progress)
+
+        # Only offered for tasks that stop between chunks
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self._cancel)
+        self.cancel_button.hide()
+        layout.addWidget(self.cancel_button)
         
-    def start(self):
+    def start(self, cancellable: bool = False):
         """Show the loading widget"""
+        self.label.setText("Processing...")
+        self.progress.setRange(0, 0)
+        self.cancel_button.setEnabled(True)
+        self.cancel_button.setVisible(cancellable)
         self.show()
-        
+
+    def set_progress(self, done: int, total: int, rate: float):
+        """Switch to a determinate bar showing done of total rows"""
+        self.progress.setRange(0, max(total, 1))
+        self.progress.setValue(min(done, max(total, 1)))
+        self.label.setText(f"{done} of {total} cookies deleted ({rate:.0f} rows/s)")
+
+    def _cancel(self):
+        self.cancel_button.setEnabled(False)
+        self.label.setText("Stopping after the current chunk...")
+        self.cancelled.emit()
+
     def stop(self):
         """Hide the loading widget"""
         self.hide()
@@ -0,0 +1,80 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+import logging
+
+class WorkerSignals(QObject):
+    """Signals emitted by a Worker, delivered on the receiver's thread"""
+    result = pyqtSignal(str, object)
+    error = pyqtSignal(str, str)
+    finished = pyqtSignal(str)
+    progress = pyqtSignal(str, object)
+
+class Worker(QRunnable):
+    """Run a blocking callable on a thread pool and report back via signals"""
+
+    def __init__(self, key: str, fn, *args, report_progress: bool = False, **kwargs):
+        super().__init__()
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        if report_progress:
+            # fn reports through this callback from the pool thread
+            self.kwargs["progress"] = lambda update: self.signals.progress.emit(self.key, update)
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            logging.error(f"Error in background task {self.key}: {str(e)}")
+            self.signals.error.emit(self.key, str(e))
+        else:
+            self.signals.result.emit(self.key, result)
+        finally:
+            self.signals.finished.emit(self.key)
+
+class TaskGroup(QObject):
+    """Run several workers concurrently and signal once all of them are done.
+
+    Results are streamed through ``result`` as each worker completes, so the
+    UI can update per task while the slowest one is still running.
+    """
+    result = pyqtSignal(str, object)
+    error = pyqtSignal(str, str)
+    finished = pyqtSignal()
+    progress = pyqtSignal(str, object)
+
+    def __init__(self, pool: QThreadPool = None, parent=None):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self._workers = []
+        self._pending = set()
+
+    def add(self, key: str, fn, *args, report_progress: bool = False, **kwargs) -> "TaskGroup":
+        """Queue a callable under key; nothing runs until start()
+
+        With report_progress fn is also given a ``progress`` callback whose
+        updates are re-emitted through this group's ``progress`` signal.
+        """
+        worker = Worker(key, fn, *args, report_progress=report_progress, **kwargs)
+        worker.signals.result.connect(self.result)
+        worker.signals.error.connect(self.error)
+        worker.signals.progress.connect(self.progress)
+        worker.signals.finished.connect(self._on_worker_finished)
+        self._workers.append(worker)
+        self._pending.add(key)
+        return self
+
+    def start(self):
+        """Submit all queued workers to the pool"""
+        if not self._workers:
+            self.finished.emit()
+            return
+        for worker in self._workers:
+            self.pool.start(worker)
+
+    def _on_worker_finished(self, key: str):
+        self._pending.discard(key)
+        if not self._pending:
+            self._workers.clear()
+            self.finished.emit()
@@ -1,18 +1,40 @@
 """Utility functions for the Browser Cookie Cleaner."""
 from .logger import setup_logger
+from .backup import BackupStore, get_backup_store
+from .cache import PurgeResult, purge_paths
+from .metrics import MetricsCollector, collect, span
 from .system import (
     get_operating_system,
     get_home_directory,
+    get_path_owner,
     is_process_running,
+    any_process_running,
+    ProcessSnapshot,
+    get_process_snapshot,
+    invalidate_process_snapshot,
+    terminate_processes,
     get_temp_directory,
     create_backup_filename
 )
 
 __all__ = [
     'setup_logger',
+    'BackupStore',
+    'get_backup_store',
+    'PurgeResult',
+    'purge_paths',
+    'MetricsCollector',
+    'collect',
+    'span',
     'get_operating_system',
     'get_home_directory',
+    'get_path_owner',
     'is_process_running',
+    'any_process_running',
+    'ProcessSnapshot',
+    'get_process_snapshot',
+    'invalidate_process_snapshot',
+    'terminate_processes',
     'get_temp_directory',
     'create_backup_filename'
 ]
\ No newline at end of file
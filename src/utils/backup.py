@@ -0,0 +1,226 @@
+"""Central, deduplicated store of compressed cookie database snapshots."""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import zlib
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class BackupStore:
+    """Compressed, content-addressed snapshots of cookie databases.
+
+    Snapshots are taken with the SQLite online backup API, so pages still
+    sitting in the WAL are included. Each snapshot is split into fixed-size
+    chunks that are stored zlib-compressed under their SHA-256, and a small
+    JSON manifest per snapshot lists its chunks. Unchanged chunks are shared
+    between snapshots, so repeated backups of a large profile only store
+    the pages that actually changed.
+
+    Layout::
+
+        <root>/objects/<aa>/<sha256>            compressed chunks
+        <root>/snapshots/<browser>/<profile>/<id>.json
+    """
+
+    CHUNK_SIZE = 256 * 1024
+    COMPRESS_LEVEL = 1
+
+    def __init__(self, root: Optional[Path] = None, max_snapshots: int = 10,
+                 max_bytes: int = 512 * 1024 * 1024):
+        """
+        Args:
+            root: Store directory (default: ~/.cookie_cleaner/backups)
+            max_snapshots: Snapshots kept per browser profile
+            max_bytes: Upper bound on the compressed size of the whole store
+        """
+        self.root = Path(root) if root else Path.home() / ".cookie_cleaner" / "backups"
+        self.max_snapshots = max_snapshots
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._pending = Counter()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / digest
+
+    def _snapshot_dir(self, browser: str, profile: str) -> Path:
+        return self.root / "snapshots" / browser / profile
+
+    def _write_object(self, digest: str, chunk: bytes) -> None:
+        path = self._object_path(digest)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(fd, "wb") as f:
+            f.write(zlib.compress(chunk, self.COMPRESS_LEVEL))
+        os.replace(tmp, path)
+
+    def snapshot(self, browser: str, profile: str, db_path: Path) -> str:
+        """Snapshot db_path and return the new snapshot id"""
+        snapshot_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        tmp_dir = self.root / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=tmp_dir, suffix=".sqlite")
+        os.close(fd)
+
+        chunks = []
+        try:
+            source = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+            target = sqlite3.connect(tmp_name)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+
+            size = 0
+            with open(tmp_name, "rb") as f:
+                while True:
+                    chunk = f.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest = hashlib.sha256(chunk).hexdigest()
+                    with self._lock:
+                        self._pending[digest] += 1
+                    chunks.append(digest)
+                    self._write_object(digest, chunk)
+                    size += len(chunk)
+
+            manifest = {
+                "id": snapshot_id,
+                "browser": browser,
+                "profile": profile,
+                "source": str(db_path),
+                "created": datetime.now().isoformat(),
+                "size": size,
+                "chunk_size": self.CHUNK_SIZE,
+                "chunks": chunks,
+            }
+            snapshot_dir = self._snapshot_dir(browser, profile)
+            snapshot_dir.mkdir(parents=True, exist_ok=True)
+            with open(snapshot_dir / f"{snapshot_id}.json", "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+        finally:
+            os.unlink(tmp_name)
+            with self._lock:
+                self._pending.subtract(chunks)
+                self._pending += Counter()
+
+        logger.info(f"Backed up {db_path} as {browser}/{profile}/{snapshot_id}")
+        self.enforce_retention(browser, profile)
+        return snapshot_id
+
+    def list_snapshots(self, browser: str, profile: str) -> List[Dict]:
+        """Get the manifests of a profile's snapshots, newest first"""
+        snapshot_dir = self._snapshot_dir(browser, profile)
+        if not snapshot_dir.exists():
+            return []
+        manifests = []
+        for path in sorted(snapshot_dir.glob("*.json"), reverse=True):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    manifests.append(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.error(f"Error reading snapshot manifest {path}: {str(e)}")
+        return manifests
+
+    def restore(self, browser: str, profile: str, snapshot: Optional[str] = None,
+                target: Optional[Path] = None) -> Path:
+        """Restore a snapshot (latest by default) into its source database.
+
+        The snapshot is reassembled into a temporary file and copied into
+        the target with the backup API, so an existing WAL is handled by
+        SQLite. The browser must not be running.
+        """
+        manifests = self.list_snapshots(browser, profile)
+        if snapshot:
+            manifests = [m for m in manifests if m["id"] == snapshot]
+        if not manifests:
+            raise FileNotFoundError(f"No snapshot {snapshot or ''} for {browser}/{profile}")
+        manifest = manifests[0]
+        target = Path(target or manifest["source"])
+
+        tmp_dir = self.root / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=tmp_dir, suffix=".sqlite")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for digest in manifest["chunks"]:
+                    with open(self._object_path(digest), "rb") as chunk:
+                        f.write(zlib.decompress(chunk.read()))
+
+            source = sqlite3.connect(tmp_name)
+            destination = sqlite3.connect(str(target))
+            try:
+                source.backup(destination)
+            finally:
+                destination.close()
+                source.close()
+        finally:
+            os.unlink(tmp_name)
+
+        logger.info(f"Restored {browser}/{profile}/{manifest['id']} to {target}")
+        return target
+
+    def _all_manifests(self) -> List[Path]:
+        return list((self.root / "snapshots").glob("*/*/*.json"))
+
+    def _object_bytes(self) -> int:
+        total = 0
+        for path in (self.root / "objects").glob("*/*"):
+            try:
+                total += path.stat().st_size
+            except OSError:
+                continue
+        return total
+
+    def enforce_retention(self, browser: str, profile: str) -> None:
+        """Drop old snapshots beyond the count and size limits"""
+        with self._lock:
+            snapshots = sorted(self._snapshot_dir(browser, profile).glob("*.json"), reverse=True)
+            for path in snapshots[self.max_snapshots:]:
+                path.unlink(missing_ok=True)
+            self._collect_garbage()
+
+            # Over the size budget: drop the oldest snapshots store-wide, but
+            # always keep each profile's newest one
+            manifests = sorted(self._all_manifests(), key=lambda p: p.name)
+            newest = {p.parent: p for p in manifests}
+            for path in manifests:
+                if self._object_bytes() <= self.max_bytes:
+                    break
+                if newest[path.parent] == path:
+                    continue
+                path.unlink(missing_ok=True)
+                self._collect_garbage()
+
+    def _collect_garbage(self) -> None:
+        """Delete chunks no manifest refers to. Caller holds the lock"""
+        referenced = set(self._pending)
+        for path in self._all_manifests():
+            try:
+                with open(path, encoding="utf-8") as f:
+                    referenced.update(json.load(f)["chunks"])
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Error reading snapshot manifest {path}: {str(e)}")
+                return  # Never delete chunks we cannot account for
+        for path in (self.root / "objects").glob("*/*"):
+            if path.name not in referenced and not path.name.startswith("tmp"):
+                path.unlink(missing_ok=True)
+
+_default_store: Optional[BackupStore] = None
+
+def get_backup_store() -> BackupStore:
+    """Get the shared backup store"""
+    global _default_store
+    if _default_store is None:
+        _default_store = BackupStore()
+    return _default_store
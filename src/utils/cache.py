@@ -0,0 +1,114 @@
+"""Parallel directory purge with byte accounting."""
+import logging
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Iterable, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+class PurgeResult(NamedTuple):
+    """Totals reclaimed by a purge"""
+    files: int = 0
+    bytes: int = 0
+    dirs: int = 0
+    errors: int = 0
+
+    def __add__(self, other):
+        return PurgeResult(*(a + b for a, b in zip(self, other)))
+
+class _Totals:
+    """Thread-safe running totals shared by the purge workers"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.files = 0
+        self.bytes = 0
+        self.errors = 0
+
+    def add(self, files: int, size: int, errors: int) -> None:
+        with self.lock:
+            self.files += files
+            self.bytes += size
+            self.errors += errors
+
+def _purge_directory(path: str, totals: _Totals) -> List[str]:
+    """Unlink every file directly inside path and return its subdirectories"""
+    files = size = errors = 0
+    subdirs = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                        continue
+                    entry_size = entry.stat(follow_symlinks=False).st_size
+                    os.unlink(entry.path)
+                    files += 1
+                    size += entry_size
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    errors += 1
+                    logger.debug(f"Could not remove {entry.path}: {str(e)}")
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        errors += 1
+        logger.debug(f"Could not scan {path}: {str(e)}")
+    totals.add(files, size, errors)
+    return subdirs
+
+def purge_paths(paths: Iterable[Path], max_workers: int = 8,
+                progress: Optional[Callable[[int, int], None]] = None) -> PurgeResult:
+    """Delete files and directory trees, returning what was reclaimed.
+
+    Directory trees are walked with ``os.scandir`` and each directory is
+    emptied by one of max_workers threads, so large trees are removed in
+    parallel. progress, if given, is called with the running (files, bytes)
+    totals as directories complete. Empty directories are removed last,
+    deepest first.
+    """
+    totals = _Totals()
+    directories = []
+    roots = []
+    for path in paths:
+        path = str(path)
+        if os.path.isdir(path) and not os.path.islink(path):
+            roots.append(path)
+            continue
+        try:
+            size = os.lstat(path).st_size
+            os.unlink(path)
+            totals.add(1, size, 0)
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            totals.add(0, 0, 1)
+            logger.debug(f"Could not remove {path}: {str(e)}")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = {pool.submit(_purge_directory, root, totals): root for root in roots}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                directories.append(pending.pop(future))
+                for subdir in future.result():
+                    pending[pool.submit(_purge_directory, subdir, totals)] = subdir
+            if progress:
+                progress(totals.files, totals.bytes)
+
+    removed_dirs = 0
+    for directory in sorted(directories, key=lambda d: d.count(os.sep), reverse=True):
+        try:
+            os.rmdir(directory)
+            removed_dirs += 1
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            totals.add(0, 0, 1)
+            logger.debug(f"Could not remove {directory}: {str(e)}")
+
+    return PurgeResult(totals.files, totals.bytes, removed_dirs, totals.errors)
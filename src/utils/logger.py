@@ -1,69 +1,92 @@
-import os
+import atexit
+import json
 import logging
-import glob
-from datetime import datetime
-from pathlib import Path
+import logging.handlers
+import os
+import queue
 import sys
+from datetime import datetime
+from typing import Optional
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+def stop_logging() -> None:
+    """Flush queued records to the handlers and stop the listener thread"""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+def setup_logger(log_dir: str = "logs", max_bytes: int = 5 * 1024 * 1024,
+                 backup_count: int = 5, json_lines: bool = False,
+                 level: int = logging.INFO):
+    """Setup logging configuration
+
+    Log calls only put the record on an in-memory queue; a background
+    QueueListener thread writes it to a size-rotated file and to stdout,
+    so no caller ever waits on the log disk. Retention is handled by the
+    rotation itself: at most backup_count old files of max_bytes are kept.
 
-def cleanup_old_logs(log_dir: str, max_files: int = 5) -> None:
-    """
-    Clean up old log files when the number of files exceeds the maximum.
-    
     Args:
-        log_dir: Directory containing log files
-        max_files: Maximum number of log files to keep (default: 5)
+        log_dir: Directory holding cookie_cleaner.log and its rotations
+        max_bytes: Size at which the log file is rotated
+        backup_count: Number of rotated files kept
+        json_lines: Write the file as JSON lines instead of plain text
+        level: Minimum level recorded
     """
-    try:
-        # Get all log files
-        log_files = glob.glob(os.path.join(log_dir, "cookie_cleaner_*.log"))
-        
-        # If number of files is within limit, do nothing
-        if len(log_files) <= max_files:
-            return
-            
-        # Sort files by modification time (oldest first)
-        log_files.sort(key=lambda x: os.path.getmtime(x))
-        
-        # Calculate how many files to delete
-        files_to_delete = len(log_files) - max_files
-        
-        # Delete oldest files
-        for i in range(files_to_delete):
-            try:
-                os.remove(log_files[i])
-                logging.info(f"Deleted old log file: {log_files[i]}")
-            except Exception as e:
-                logging.error(f"Error deleting log file {log_files[i]}: {str(e)}")
-                
-    except Exception as e:
-        logging.error(f"Error during log cleanup: {str(e)}")
+    global _listener, _queue_handler
+    stop_logging()
 
-def setup_logger():
-    """Setup logging configuration"""
-    # Create logs directory if it doesn't exist
-    log_dir = "logs"
     os.makedirs(log_dir, exist_ok=True)
-    
-    # Clean up old logs before creating new one
-    cleanup_old_logs(log_dir)
-    
-    # Create log filename with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_file = os.path.join(log_dir, f"cookie_cleaner_{timestamp}.log")
-    
-    # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler(sys.stdout)
-        ]
+    file_handler = logging.handlers.RotatingFileHandler(
+        os.path.join(log_dir, "cookie_cleaner.log"),
+        maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True
+    )
+    file_handler.setFormatter(JsonFormatter() if json_lines else logging.Formatter(LOG_FORMAT))
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
     )
-    
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+    _listener.start()
+    atexit.unregister(stop_logging)
+    atexit.register(stop_logging)
+
     # Log system information
     logging.info("Starting Browser Cookie Cleaner")
     logging.info(f"Python version: {sys.version}")
     logging.info(f"Operating System: {sys.platform}")
-    
-    return logging.getLogger(__name__)
\ No newline at end of file
+
+    return logging.getLogger(__name__)
@@ -0,0 +1,179 @@
+"""Lightweight per-phase timing for cleaning runs.
+
+Code wraps each phase of work in ``span()``::
+
+    with span("delete", browser="chrome") as s:
+        s.rows = conn.execute("DELETE ...").rowcount
+
+Every finished span is logged at debug level and handed to the collectors
+that are currently recording. A ``MetricsCollector`` groups the spans of
+one run, summarizes them per phase and writes them as JSON or as a
+Prometheus textfile.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class Span:
+    """One timed phase with optional row and byte counts"""
+
+    def __init__(self, phase: str, labels: Dict[str, str]):
+        self.phase = phase
+        self.labels = labels
+        self.rows = 0
+        self.bytes = 0
+        self.started = time.time()
+        self.duration = 0.0
+        self.error = False
+
+    def to_dict(self) -> Dict:
+        return {
+            "phase": self.phase, "labels": self.labels, "started": self.started,
+            "duration": self.duration, "rows": self.rows, "bytes": self.bytes,
+            "error": self.error,
+        }
+
+_collectors: List["MetricsCollector"] = []
+_collectors_lock = threading.Lock()
+
+@contextmanager
+def span(phase: str, **labels) -> Iterator[Span]:
+    """Time the enclosed block as phase; set rows/bytes on the yielded span"""
+    current = Span(phase, {k: str(v) for k, v in labels.items() if v is not None})
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException:
+        current.error = True
+        raise
+    finally:
+        current.duration = time.perf_counter() - start
+        logger.debug(
+            f"{phase} {current.labels} took {current.duration * 1000:.1f} ms "
+            f"(rows={current.rows}, bytes={current.bytes})"
+        )
+        with _collectors_lock:
+            collectors = list(_collectors)
+        for collector in collectors:
+            collector.add(current)
+
+class MetricsCollector:
+    """Spans recorded between start() and stop(), from any thread"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self.started: Optional[float] = None
+        self.stopped: Optional[float] = None
+
+    def start(self) -> "MetricsCollector":
+        self.started = time.time()
+        with _collectors_lock:
+            _collectors.append(self)
+        return self
+
+    def stop(self) -> "MetricsCollector":
+        with _collectors_lock:
+            if self in _collectors:
+                _collectors.remove(self)
+        self.stopped = time.time()
+        return self
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def _totals(self, key) -> Dict:
+        """Sum count, seconds, rows and bytes of the spans grouped by key(span)"""
+        groups: Dict = {}
+        with self._lock:
+            spans = list(self.spans)
+        for s in spans:
+            totals = groups.setdefault(key(s), {"count": 0, "seconds": 0.0, "rows": 0, "bytes": 0})
+            totals["count"] += 1
+            totals["seconds"] += s.duration
+            totals["rows"] += s.rows
+            totals["bytes"] += s.bytes
+        return groups
+
+    def summary(self) -> Dict[str, Dict]:
+        """Totals per phase: count, seconds, rows and bytes, in first-seen order"""
+        return self._totals(lambda s: s.phase)
+
+    def format_breakdown(self) -> str:
+        """Human-readable per-phase table"""
+        lines = [f"{'phase':<14}{'count':>6}{'ms':>11}{'rows':>10}{'bytes':>14}"]
+        for phase, t in self.summary().items():
+            lines.append(f"{phase:<14}{t['count']:>6}{t['seconds'] * 1000:>11.1f}"
+                         f"{t['rows']:>10}{t['bytes']:>14}")
+        return "\n".join(lines)
+
+    def log_summary(self, level: int = logging.INFO) -> None:
+        for phase, t in self.summary().items():
+            logger.log(level, f"Phase {phase}: {t['count']}x, {t['seconds'] * 1000:.1f} ms, "
+                              f"{t['rows']} rows, {t['bytes']} bytes")
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            spans = [s.to_dict() for s in self.spans]
+        return {"started": self.started, "stopped": self.stopped,
+                "phases": self.summary(), "spans": spans}
+
+    def to_prometheus(self, prefix: str = "cookie_cleaner") -> str:
+        """Render the run in the Prometheus text exposition format"""
+        series = self._totals(lambda s: (s.phase, tuple(sorted(s.labels.items()))))
+
+        lines = []
+        for field, help_text in (("seconds", "Time spent in the phase during the last run"),
+                                 ("rows", "Rows processed by the phase during the last run"),
+                                 ("bytes", "Bytes processed by the phase during the last run"),
+                                 ("count", "Times the phase ran during the last run")):
+            name = f"{prefix}_phase_{field}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for (phase, labels), totals in series.items():
+                label_text = ",".join(
+                    f'{k}="{_escape_label(v)}"' for k, v in (("phase", phase),) + labels
+                )
+                lines.append(f"{name}{{{label_text}}} {totals[field]}")
+        lines.append(f"# TYPE {prefix}_last_run_timestamp_seconds gauge")
+        lines.append(f"{prefix}_last_run_timestamp_seconds {self.stopped or time.time()}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path) -> Path:
+        """Atomically write the run to path; ``.prom`` selects the textfile format"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == ".prom":
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.to_dict(), indent=2)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".metrics")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp, path)
+        return path
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+@contextmanager
+def collect() -> Iterator[MetricsCollector]:
+    """Record every span finished inside the block"""
+    collector = MetricsCollector().start()
+    try:
+        yield collector
+    finally:
+        collector.stop()
+
+def default_metrics_path() -> Path:
+    """Where the GUI writes the metrics of its last run"""
+    return Path.home() / ".cookie_cleaner" / "metrics.json"
@@ -1,8 +1,12 @@
+import os
 import sys
+import time
+import threading
 import psutil
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterable, List, Optional
+from .metrics import span
 
 logger = logging.getLogger(__name__)
 
@@ -21,20 +25,175 @@ def get_home_directory() -> Path:
     """Get user's home directory"""
     return Path.home()
 
-def is_process_running(process_name: str) -> bool:
-    """Check if a process is running by name"""
+def get_path_owner(path: Path) -> Optional[str]:
+    """Get the name of the user owning path, where the platform exposes it"""
     try:
-        for proc in psutil.process_iter(['name']):
-            try:
-                if process_name.lower() in proc.info['name'].lower():
-                    return True
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                continue
-        return False
+        import pwd
+        return pwd.getpwuid(os.stat(path).st_uid).pw_name
+    except (ImportError, KeyError, OSError):
+        return None
+
+class ProcessSnapshot:
+    """Point-in-time index of the process table.
+
+    The process table is scanned once and indexed by lowercased process
+    name and executable basename, so any number of liveness queries can be
+    answered without walking ``psutil.process_iter`` again. Queries can be
+    limited to the processes of one user.
+    """
+
+    def __init__(self):
+        self.created = time.monotonic()
+        self._index: Dict[str, List[int]] = {}
+        self._users: Dict[int, Optional[str]] = {}
+        self._scan()
+
+    def _scan(self) -> None:
+        with span("process_scan") as s:
+            for proc in psutil.process_iter(['pid', 'name', 'exe', 'username']):
+                try:
+                    info = proc.info
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    continue
+                s.rows += 1
+                self._users[info['pid']] = info.get('username')
+                keys = set()
+                if info.get('name'):
+                    keys.add(info['name'].lower())
+                if info.get('exe'):
+                    keys.add(os.path.basename(info['exe']).lower())
+                for key in keys:
+                    self._index.setdefault(key, []).append(info['pid'])
+
+    def age(self) -> float:
+        """Seconds elapsed since the snapshot was taken"""
+        return time.monotonic() - self.created
+
+    def find(self, process_name: str, user: Optional[str] = None) -> List[int]:
+        """Return the PIDs whose name or executable contains process_name.
+
+        With user only processes owned by that user are returned.
+        """
+        needle = process_name.lower()
+        pids = set(self._index.get(needle, ()))
+        # Substring matches are resolved against the distinct names only,
+        # which is far smaller than the process table itself
+        for key, key_pids in self._index.items():
+            if needle in key:
+                pids.update(key_pids)
+        if user is not None:
+            pids = {pid for pid in pids if self._users.get(pid) == user}
+        return sorted(pids)
+
+    def is_running(self, process_name: str, user: Optional[str] = None) -> bool:
+        """Check if a process matching process_name was running"""
+        if user is not None:
+            return bool(self.find(process_name, user))
+        needle = process_name.lower()
+        if needle in self._index:
+            return True
+        return any(needle in key for key in self._index)
+
+    def any_running(self, process_names: Iterable[str],
+                    user: Optional[str] = None) -> Optional[str]:
+        """Return the first of process_names that was running, if any"""
+        for name in process_names:
+            if self.is_running(name, user):
+                return name
+        return None
+
+
+_snapshot: Optional[ProcessSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+def get_process_snapshot(max_age: float = 1.0) -> ProcessSnapshot:
+    """Return a shared process snapshot no older than max_age seconds"""
+    global _snapshot
+    with _snapshot_lock:
+        if _snapshot is None or _snapshot.age() > max_age:
+            _snapshot = ProcessSnapshot()
+        return _snapshot
+
+def invalidate_process_snapshot() -> None:
+    """Discard the shared snapshot, e.g. after killing processes"""
+    global _snapshot
+    with _snapshot_lock:
+        _snapshot = None
+
+def is_process_running(process_name: str, user: Optional[str] = None) -> bool:
+    """Check if a process is running by name, optionally for one user only"""
+    try:
+        return get_process_snapshot().is_running(process_name, user)
     except Exception as e:
         logger.error(f"Error checking process {process_name}: {str(e)}")
         return False
 
+def any_process_running(process_names: Iterable[str],
+                        user: Optional[str] = None) -> Optional[str]:
+    """Return the first running process out of process_names, if any"""
+    try:
+        return get_process_snapshot().any_running(process_names, user)
+    except Exception as e:
+        logger.error(f"Error checking processes: {str(e)}")
+        return None
+
+def terminate_processes(process_names: Iterable[str], timeout: Optional[float] = None,
+                        kill_timeout: float = 2.0, user: Optional[str] = None) -> bool:
+    """Terminate every process matching process_names, children included.
+
+    The whole tree gets SIGTERM first and ``psutil.wait_procs`` returns as
+    soon as the last process exits. Only processes still alive after the
+    timeout (by default 1s plus 50ms per process, capped at 5s) are sent
+    SIGKILL. With user only that user's processes are touched. Returns
+    True once no matching process is left.
+    """
+    snapshot = ProcessSnapshot()
+    pids = set()
+    for name in process_names:
+        pids.update(snapshot.find(name, user))
+    pids.discard(os.getpid())
+
+    with span("terminate") as s:
+        procs = {}
+        for pid in pids:
+            try:
+                proc = psutil.Process(pid)
+                procs[pid] = proc
+                for child in proc.children(recursive=True):
+                    procs[child.pid] = child
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        procs.pop(os.getpid(), None)
+        s.rows = len(procs)
+
+        if not procs:
+            invalidate_process_snapshot()
+            return True
+
+        for proc in procs.values():
+            try:
+                proc.terminate()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+
+        if timeout is None:
+            timeout = min(5.0, 1.0 + 0.05 * len(procs))
+        _, alive = psutil.wait_procs(list(procs.values()), timeout=timeout)
+
+        if alive:
+            logger.info(f"Killing {len(alive)} processes that ignored SIGTERM")
+            for proc in alive:
+                try:
+                    proc.kill()
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            _, alive = psutil.wait_procs(alive, timeout=kill_timeout)
+
+        invalidate_process_snapshot()
+        if alive:
+            logger.error(f"Unable to terminate processes: {[p.pid for p in alive]}")
+        return not alive
+
 def get_temp_directory() -> Path:
     """Get system temporary directory"""
     return Path(sys.prefix) / "temp"
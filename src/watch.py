@@ -0,0 +1,209 @@
+"""Long-running watch mode that applies a cleaning policy as cookies appear.
+
+Each browser profile's cookie database (and its ``-wal`` file) is watched
+with Linux inotify, falling back to stat polling elsewhere. Bursts of
+writes are debounced, and once the browser has exited the policy is
+applied to the rows written since the previous pass only.
+"""
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import sqlite3
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from .browsers import BrowserBase
+
+logger = logging.getLogger(__name__)
+
+class PollingWatcher:
+    """Detect database changes by comparing stat signatures at an interval"""
+
+    def __init__(self, paths: Iterable[Path], interval: float = 2.0):
+        self.interval = interval
+        self._signatures = {Path(p): BrowserBase._stat_signature(Path(p)) for p in paths}
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        """Block up to timeout seconds (forever if None) for changed databases"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = set()
+            for path, signature in self._signatures.items():
+                current = BrowserBase._stat_signature(path)
+                if current != signature:
+                    self._signatures[path] = current
+                    changed.add(path)
+            if changed:
+                return changed
+            remaining = self.interval if deadline is None else deadline - time.monotonic()
+            if remaining <= 0:
+                return set()
+            time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        pass
+
+class InotifyWatcher:
+    """Detect database changes through Linux inotify on their directories"""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT = struct.Struct("iIII")
+
+    def __init__(self, paths: Iterable[Path]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        # Watch directories, since SQLite creates and removes the -wal file
+        self._watches: Dict[int, Dict[str, Path]] = {}
+        by_dir: Dict[Path, Dict[str, Path]] = {}
+        for path in paths:
+            path = Path(path)
+            names = by_dir.setdefault(path.parent, {})
+            names[path.name] = path
+            names[path.name + "-wal"] = path
+        for directory, names in by_dir.items():
+            wd = libc.inotify_add_watch(self._fd, os.fsencode(directory), self.MASK)
+            if wd < 0:
+                os.close(self._fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+            self._watches[wd] = names
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        """Block up to timeout seconds (forever if None) for changed databases"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if not ready:
+                return set()
+            changed = self._read_events()
+            if changed:
+                return changed
+
+    def _read_events(self) -> Set[Path]:
+        changed = set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, _mask, _cookie, length = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+            path = self._watches.get(wd, {}).get(name)
+            if path:
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+def create_watcher(paths: List[Path], poll_interval: float = 2.0):
+    """Use inotify where available, otherwise fall back to polling"""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError) as e:
+            logger.warning(f"inotify unavailable, polling instead: {str(e)}")
+    return PollingWatcher(paths, poll_interval)
+
+class CookieWatch:
+    """Apply a cleaning policy to browser profiles whenever their cookies change.
+
+    Args:
+        browsers: Browsers to watch; every profile with a cookie DB is covered
+        blocked: Domain patterns whose cookies are always removed
+        prune_expired: Also remove cookies that have expired
+        debounce: Seconds of quiet required before a burst counts as finished
+        recheck: Seconds between liveness checks while a browser is running
+        poll_interval: Stat polling interval when inotify is not available
+    """
+
+    def __init__(self, browsers: Iterable[BrowserBase], blocked: Optional[List[str]] = None,
+                 prune_expired: bool = True, debounce: float = 0.5, recheck: float = 1.0,
+                 poll_interval: float = 2.0):
+        self.blocked = blocked or []
+        self.prune_expired = prune_expired
+        self.debounce = debounce
+        self.recheck = recheck
+        self.poll_interval = poll_interval
+        self._profiles: Dict[Path, BrowserBase] = {}
+        for browser in browsers:
+            for profile_browser in browser.profile_browsers():
+                self._profiles[profile_browser.get_cookie_path()] = profile_browser
+        self._high_water: Dict[Path, int] = {}
+        self._applied: Dict[Path, tuple] = {}
+        self._stopped = False
+
+    def apply(self, path: Path) -> int:
+        """Run one incremental policy pass over a database; returns rows removed"""
+        browser = self._profiles[path]
+        deleted, high_water = browser.apply_policy(
+            self._high_water.get(path, 0), self.blocked, self.prune_expired
+        )
+        self._high_water[path] = high_water
+        # Remember the state we left so our own write is not seen as new
+        self._applied[path] = BrowserBase._stat_signature(path)
+        return deleted
+
+    def stop(self):
+        """Ask run() to return after its current wait"""
+        self._stopped = True
+
+    def run(self, max_passes: Optional[int] = None) -> None:
+        """Watch until stop() is called (or max_passes passes were applied)"""
+        if not self._profiles:
+            logger.warning("No cookie databases to watch")
+            return
+
+        # Catch up on everything present before watching for changes
+        dirty: Set[Path] = set(self._profiles)
+        passes = 0
+        watcher = create_watcher(list(self._profiles), self.poll_interval)
+        try:
+            while not self._stopped:
+                if dirty:
+                    # Debounce: keep collecting until writes go quiet
+                    changed = watcher.wait(self.debounce)
+                    while changed:
+                        dirty |= changed
+                        changed = watcher.wait(self.debounce)
+
+                    waiting = set()
+                    for path in dirty:
+                        if BrowserBase._stat_signature(path) == self._applied.get(path):
+                            continue
+                        if self._profiles[path].is_running():
+                            waiting.add(path)
+                            continue
+                        try:
+                            self.apply(path)
+                        except sqlite3.Error as e:
+                            # Usually the browser started again and holds the lock
+                            logger.warning(f"Policy pass on {path} failed, will retry: {str(e)}")
+                            waiting.add(path)
+                            continue
+                        passes += 1
+                    dirty = waiting
+                    if max_passes is not None and passes >= max_passes:
+                        return
+
+                # Idle: block on the watcher, waking only to re-check
+                # whether a browser with pending changes has exited
+                dirty |= watcher.wait(self.recheck if dirty else None)
+        finally:
+            watcher.close()
@@ -0,0 +1,424 @@
+"""Behaviour tests against small synthetic browser profiles.
+
+Profiles are laid out with the benchmark generators under a temporary home,
+so the tests exercise the same discovery and SQL the CLI and GUI use.
+"""
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+
+from benchmarks.cookie_bench import WINDOWS_EPOCH_OFFSET, create_chrome_db, create_profile
+from src.browsers import get_browser_class
+from src.browsers.search import HostIndex
+from src.browsers.unified import UnifiedCookies
+from src.utils.backup import BackupStore
+from src.watch import CookieWatch
+
+BROWSERS = ["chrome", "firefox"]
+
+def _chrome_time(unix: int) -> int:
+    return (unix + WINDOWS_EPOCH_OFFSET) * 1000000 if unix else 0
+
+def add_cookies(browser_name, cookie_path, cookies):
+    """Insert (host, name, path, expiry_unix, key) rows; expiry 0 is a session cookie.
+
+    key goes into the column that keeps otherwise identical cookies apart
+    (top_frame_site_key / originAttributes), so (host, name, path) may repeat.
+    """
+    conn = sqlite3.connect(str(cookie_path))
+    try:
+        if browser_name == "firefox":
+            conn.executemany(
+                "INSERT INTO moz_cookies (originAttributes, name, value, host, path, expiry,"
+                " lastAccessed, creationTime, isSecure, isHttpOnly)"
+                " VALUES (?, ?, 'v', ?, ?, ?, 0, 0, 1, 0)",
+                [(key, name, host, path, expiry) for host, name, path, expiry, key in cookies],
+            )
+        else:
+            conn.executemany(
+                "INSERT INTO cookies VALUES (0, ?, ?, ?, 'v', x'', ?, ?, 1, 0, 0, ?, ?, 1, 0, 2, 443, 0, 0, 0)",
+                [(host, key, name, path, _chrome_time(expiry), int(expiry != 0), int(expiry != 0))
+                 for host, name, path, expiry, key in cookies],
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+@contextmanager
+def locked(cookie_path):
+    """Hold an exclusive lock on cookie_path, as a running browser does"""
+    conn = sqlite3.connect(str(cookie_path))
+    try:
+        conn.execute("PRAGMA locking_mode=EXCLUSIVE")
+        conn.execute("BEGIN EXCLUSIVE")
+        yield
+    finally:
+        conn.close()
+
+@pytest.fixture(params=BROWSERS)
+def profile(request, tmp_path, monkeypatch):
+    """(browser, cookie_path) for an empty default profile of each browser"""
+    browser_class = get_browser_class(request.param)
+    monkeypatch.setattr(browser_class, "is_running", lambda self: False)
+    cookie_path = create_profile(request.param, tmp_path / "home", 0)
+    browser = browser_class(home=tmp_path / "home", backup_store=BackupStore(tmp_path / "backups"))
+    return browser, cookie_path
+
+def hosts(browser):
+    return sorted(cookie.host for cookie in browser.iter_cookies())
+
+HOSTS = ["example.com", ".example.com", "www.example.com", "notexample.com", "other.org"]
+
+def add_hosts(browser, cookie_path):
+    future = int(time.time()) + 86400
+    add_cookies(browser.NAME, cookie_path,
+                [(host, f"c{i}", "/", future, "") for i, host in enumerate(HOSTS)])
+
+def test_include_exact_host(profile):
+    browser, cookie_path = profile
+    add_hosts(browser, cookie_path)
+    result = browser.clean_cookies(include=["example.com"])
+    assert result.success and not result.cancelled
+    assert (result.initial, result.final) == (5, 3)
+    assert hosts(browser) == ["notexample.com", "other.org", "www.example.com"]
+
+def test_include_subdomains(profile):
+    browser, cookie_path = profile
+    add_hosts(browser, cookie_path)
+    browser.clean_cookies(include=[".example.com"])
+    assert hosts(browser) == ["notexample.com", "other.org"]
+
+def test_exclude_subdomains(profile):
+    browser, cookie_path = profile
+    add_hosts(browser, cookie_path)
+    browser.clean_cookies(exclude=["*.example.com"])
+    assert hosts(browser) == [".example.com", "example.com", "www.example.com"]
+
+def test_chunked_delete_without_progress(profile):
+    browser, cookie_path = profile
+    future = int(time.time()) + 86400
+    add_cookies(browser.NAME, cookie_path,
+                [(f"h{i}.com", "n", "/", future, "") for i in range(25)])
+    # Cancellable but not counted up front: chunks run until a short one
+    result = browser.clean_cookies(exclude=["h0.com"], chunk_size=10,
+                                   cancel=threading.Event())
+    assert not result.cancelled and (result.initial, result.final) == (25, 1)
+    assert hosts(browser) == ["h0.com"]
+
+def test_paging_resumes_past_duplicate_keys(profile):
+    browser, cookie_path = profile
+    future = int(time.time()) + 86400
+    add_cookies(browser.NAME, cookie_path,
+                [("dup.com", "same", "/", future, f"k{i}") for i in range(5)]
+                + [("a.com", "x", "/", future, ""), ("z.com", "y", "/", future, "")])
+
+    streamed = list(browser.iter_cookies(batch_size=2))
+    assert len(streamed) == 7
+    assert len({cookie.rowid for cookie in streamed}) == 7
+
+    paged, after = [], 0
+    while True:
+        page = browser.get_cookie_details(limit=2, after_rowid=after)
+        if not page:
+            break
+        paged.extend(page)
+        after = page[-1].rowid
+    assert [cookie.rowid for cookie in paged] == [cookie.rowid for cookie in streamed]
+    assert sum(cookie.host == "dup.com" for cookie in paged) == 5
+
+def test_backup_snapshot_dedup_restore(profile, tmp_path):
+    browser, cookie_path = profile
+    add_hosts(browser, cookie_path)
+    store = browser.backup_store
+    profile_name = browser.get_profile_name()
+
+    first = store.snapshot(browser.NAME, profile_name, cookie_path)
+    objects = sorted((tmp_path / "backups" / "objects").glob("*/*"))
+    second = store.snapshot(browser.NAME, profile_name, cookie_path)
+    manifests = {m["id"]: m for m in store.list_snapshots(browser.NAME, profile_name)}
+    # An unchanged database stores no new chunks
+    assert manifests[first]["chunks"] == manifests[second]["chunks"]
+    assert sorted((tmp_path / "backups" / "objects").glob("*/*")) == objects
+
+    # Cleaning snapshots first, so restoring the latest brings the cookies back
+    assert browser.clean_cookies().final == 0
+    assert len(store.list_snapshots(browser.NAME, profile_name)) == 3
+    assert browser.restore_backup()
+    assert hosts(browser) == sorted(HOSTS)
+    assert browser.get_cookie_count() == len(HOSTS)
+def test_prune_keeps_session_and_live_cookies(profile):
+    browser, cookie_path = profile
+    now = int(time.time())
+    add_cookies(browser.NAME, cookie_path, [
+        ("expired.com", "a", "/", now - 3600, ""),
+        ("live.com", "b", "/", now + 3600, ""),
+        ("session.com", "c", "/", 0, ""),
+    ])
+    result = browser.prune_expired()
+    assert result.success and (result.initial, result.final) == (3, 2)
+    assert hosts(browser) == ["live.com", "session.com"]
+
+def test_chunked_delete_cancel(profile):
+    browser, cookie_path = profile
+    future = int(time.time()) + 86400
+    add_cookies(browser.NAME, cookie_path,
+                [(f"h{i}.com", "n", "/", future, "") for i in range(50)])
+    cancel = threading.Event()
+    updates = []
+
+    def progress(update):
+        updates.append(update)
+        cancel.set()
+
+    result = browser.clean_cookies(chunk_size=10, progress=progress, cancel=cancel)
+    assert result.success and result.cancelled
+    assert (result.initial, result.final) == (50, 40)
+    assert [(u.done, u.total) for u in updates] == [(10, 50)]
+    assert browser.get_cookie_count() == 40
+
+    result = browser.clean_cookies(chunk_size=10)
+    assert not result.cancelled and result.final == 0
+
+def test_expiry_in_unix_seconds(profile):
+    browser, cookie_path = profile
+    now = int(time.time())
+    add_cookies(browser.NAME, cookie_path, [
+        ("live.com", "a", "/", now + 3600, ""),
+        ("session.com", "b", "/", 0, ""),
+    ])
+    # Both epochs come out as Unix seconds, session cookies as None
+    expiry = {cookie.host: cookie.expiry for cookie in browser.iter_cookies()}
+    assert expiry == {"live.com": now + 3600, "session.com": None}
+
+def test_locked_database_reads_without_waiting(profile):
+    browser, cookie_path = profile
+    add_hosts(browser, cookie_path)
+    with locked(cookie_path):
+        started = time.perf_counter()
+        assert browser.get_cookie_count() == len(HOSTS)
+        assert hosts(browser) == sorted(HOSTS)
+        # Falls back to a snapshot instead of sitting out the busy timeout
+        assert time.perf_counter() - started < 1
+
+def chrome_with_profiles(home, extra):
+    """Chrome with a 10-row default profile plus extra 10-row profiles"""
+    default = create_profile("chrome", home, 10)
+    chrome = get_browser_class("chrome")(home=home)
+    for i in range(1, extra + 1):
+        create_chrome_db(chrome.get_data_dir() / f"Profile {i}/Network/Cookies", 10, i)
+    return chrome, default
+
+def test_unified_sites_across_browsers(tmp_path):
+    future = int(time.time()) + 86400
+    chrome, chrome_db = chrome_with_profiles(tmp_path, 0)
+    firefox_db = create_profile("firefox", tmp_path, 0)
+    add_cookies("chrome", chrome_db, [("shared.com", "a", "/", future, "")])
+    add_cookies("firefox", firefox_db, [(".shared.com", "b", "/", 0, ""),
+                                        ("www.shared.com", "c", "/", future, "")])
+    unified = UnifiedCookies([("chrome", chrome),
+                              ("firefox", get_browser_class("firefox")(home=tmp_path))])
+
+    assert unified.counts() == {"chrome": {"Default": 11}, "firefox": {"bench.default-release": 2}}
+    sites = unified.sites(by_site=True, min_browsers=2)
+    assert [(s.domain, s.browsers, s.cookies) for s in sites] == \
+        [("shared.com", ("chrome", "firefox"), 3)]
+
+def test_unified_batches_beyond_attach_limit(tmp_path):
+    chrome, _ = chrome_with_profiles(tmp_path, 11)
+    with UnifiedCookies([("chrome", chrome)]).open() as conn:
+        # More databases than SQLite attaches at once are copied in batches
+        assert len(conn.execute("PRAGMA database_list").fetchall()) <= conn.getlimit(
+            sqlite3.SQLITE_LIMIT_ATTACHED) + 2
+        assert conn.execute("SELECT COUNT(DISTINCT profile), COUNT(*) FROM all_cookies"
+                            ).fetchone() == (12, 120)
+
+@pytest.mark.parametrize("extra", [0, 11], ids=["attached", "batched"])
+def test_unified_reads_locked_databases(tmp_path, extra):
+    chrome, default = chrome_with_profiles(tmp_path, extra)
+    with locked(default):
+        started = time.perf_counter()
+        counts = UnifiedCookies([("chrome", chrome)]).counts()["chrome"]
+        assert time.perf_counter() - started < 1
+    assert counts["Default"] == 10
+    assert sum(counts.values()) == 10 * (extra + 1)
+
+def test_connection_reused_across_pages(profile):
+    browser, cookie_path = profile
+    future = int(time.time()) + 86400
+    add_cookies(browser.NAME, cookie_path,
+                [(f"h{i}.com", "n", "/", future, "") for i in range(5)])
+    with locked(cookie_path):
+        conn = browser.connect_cookies()
+    try:
+        # The snapshot taken under the lock keeps serving pages after it
+        first = browser.get_cookie_details(3, columns=(), conn=conn)
+        rest = browser.get_cookie_details(3, first[-1].rowid, columns=(), conn=conn)
+        assert [c.host for c in first + rest] == [f"h{i}.com" for i in range(5)]
+    finally:
+        conn.close()
+
+def test_source_reader_releases_connections(profile):
+    pytest.importorskip("PyQt6")
+    from src.gui.models import SourceReader
+
+    browser, cookie_path = profile
+    add_hosts(browser, cookie_path)
+    reader = SourceReader([("b", browser)])
+    assert len(reader.read(0, 0, 2)) == 2
+    assert len(reader._connections) == 1
+    # A short page ends the source and closes its connection
+    assert len(reader.read(0, 0, 10)) == len(HOSTS)
+    assert not reader._connections
+    reader.read(0, 0, 2)
+    reader.close()
+    assert not reader._connections and reader.read(0, 0, 2) == []
+
+def test_cookie_table_unsorted_until_header_clicked(profile):
+    QtCore = pytest.importorskip("PyQt6.QtCore")
+    from src.gui.models import CookieTableModel
+
+    app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+    browser, cookie_path = profile
+    add_hosts(browser, cookie_path)
+    pool = QtCore.QThreadPool()
+    model = CookieTableModel([("b", browser)], pool=pool)
+    while model.canFetchMore():
+        model.fetchMore()
+        pool.waitForDone()
+        app.processEvents()
+
+    def column(index):
+        return [model.data(model.index(row, index)) for row in range(model.rowCount())]
+
+    # Storage order until a column is sorted; clearing the sort restores it
+    model.sort(-1)
+    assert column(1) == HOSTS
+    model.sort(1)
+    assert column(1) == sorted(HOSTS)
+    model.sort(-1)
+    assert column(1) == HOSTS
+    model.close()
+
+def test_reads_leave_stat_signature_alone(profile):
+    browser, cookie_path = profile
+    add_hosts(browser, cookie_path)
+    signature = browser._stat_signature(cookie_path)
+    # Opening a WAL database read-only creates an empty -wal file
+    browser.get_cookie_details()
+    browser.summarize_domains()
+    assert browser._stat_signature(cookie_path) == signature
+
+def set_expiry(browser, cookie_path, host, expiry):
+    column = "expiry" if browser.NAME == "firefox" else "expires_utc"
+    value = expiry if browser.NAME == "firefox" else _chrome_time(expiry)
+    conn = sqlite3.connect(str(cookie_path))
+    try:
+        conn.execute(f"UPDATE {browser.TABLE_NAME} SET {column} = ? WHERE {browser.HOST_COLUMN} = ?",
+                     (value, host))
+        conn.commit()
+    finally:
+        conn.close()
+
+def test_apply_policy_blocks_new_rows_only(profile):
+    browser, cookie_path = profile
+    future = int(time.time()) + 86400
+    add_cookies(browser.NAME, cookie_path, [("old.tracker.com", "a", "/", future, ""),
+                                            ("keep.com", "b", "/", future, "")])
+    deleted, high_water = browser.apply_policy(0, [".tracker.com"])
+    assert deleted == 1 and hosts(browser) == ["keep.com"]
+
+    add_cookies(browser.NAME, cookie_path, [("tracker.com", "c", "/", future, ""),
+                                            ("www.tracker.com", "d", "/", future, ""),
+                                            ("new.com", "e", "/", future, "")])
+    deleted, high_water = browser.apply_policy(high_water, [".tracker.com"])
+    assert deleted == 2 and hosts(browser) == ["keep.com", "new.com"]
+
+    # Rows at or below the high-water mark are not matched again ...
+    add_cookies(browser.NAME, cookie_path, [("late.tracker.com", "f", "/", future, "")])
+    _, high_water = browser.apply_policy(high_water, prune_expired=False)
+    assert browser.apply_policy(high_water, [".tracker.com"])[0] == 0
+    # ... but a cookie expiring after the pass that saw it is still pruned
+    set_expiry(browser, cookie_path, "keep.com", int(time.time()) - 60)
+    assert browser.apply_policy(high_water, [".tracker.com"])[0] == 1
+    assert hosts(browser) == ["late.tracker.com", "new.com"]
+
+def test_watch_applies_policy_to_new_cookies(profile):
+    browser, cookie_path = profile
+    future = int(time.time()) + 86400
+    add_cookies(browser.NAME, cookie_path, [("tracker.com", "a", "/", future, ""),
+                                            ("keep.com", "b", "/", future, "")])
+    watch = CookieWatch([browser], blocked=[".tracker.com"], debounce=0.05, recheck=0.05,
+                        poll_interval=0.05)
+    thread = threading.Thread(target=watch.run, kwargs={"max_passes": 2}, daemon=True)
+    thread.start()
+
+    # The first pass catches up on what was there before watching
+    deadline = time.monotonic() + 10
+    while watch._high_water.get(cookie_path) is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert hosts(browser) == ["keep.com"]
+
+    add_cookies(browser.NAME, cookie_path, [("ads.tracker.com", "c", "/", future, "")])
+    thread.join(10)
+    watch.stop()
+    assert not thread.is_alive()
+    assert hosts(browser) == ["keep.com"]
+
+def test_compact_reclaims_partly_filled_pages(profile):
+    browser, cookie_path = profile
+    future = int(time.time()) + 86400
+    add_cookies(browser.NAME, cookie_path,
+                [(f"host{i}.example", f"name{i}", "/", future, "") for i in range(20000)])
+    conn = sqlite3.connect(str(cookie_path))
+    try:
+        # Every other row: pages end up half full rather than free
+        conn.execute(f"DELETE FROM {browser.TABLE_NAME} WHERE rowid % 2 = 0")
+        conn.commit()
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        reclaimable = browser._reclaimable_bytes(conn, 0)
+    finally:
+        conn.close()
+    if reclaimable is None:
+        pytest.skip("SQLite built without dbstat")
+    page_size = 4096
+    assert reclaimable > 10 * max(free_pages, 1) * page_size
+
+    before, after = browser.compact_database(min_gain=64 * 1024)
+    assert after < before * 0.75
+    assert browser.get_cookie_count() == 10000
+
+def test_compact_skips_small_gain(profile):
+    browser, cookie_path = profile
+    add_hosts(browser, cookie_path)
+    conn = sqlite3.connect(str(cookie_path))
+    try:
+        if browser._reclaimable_bytes(conn, 0) is None:
+            pytest.skip("SQLite built without dbstat")
+    finally:
+        conn.close()
+    browser.clean_cookies(include=["other.org"])
+    before, after = browser.compact_database()
+    assert before == after
+    assert hosts(browser) == sorted(h for h in HOSTS if h != "other.org")
+
+def test_host_index_search_and_refresh(profile):
+    browser, cookie_path = profile
+    add_hosts(browser, cookie_path)
+    # Labels may repeat, e.g. two profiles with the same display name
+    index = HostIndex([("Same", browser), ("Same", browser)])
+    assert index.refresh() == 2 and index.stale() == []
+
+    matches = index.search("*.example.com")
+    assert {(m.host, m.cookies) for m in matches} >= {("example.com", 2), ("www.example.com", 1)}
+    assert len([m for m in matches if m.host == "www.example.com"]) == 2
+    assert [m.host for m in index.search("www.")] == ["www.example.com"] * 2
+    assert index.search("nothing.here") == []
+
+    future = int(time.time()) + 86400
+    add_cookies(browser.NAME, cookie_path, [("mail.other.org", "z", "/", future, "")])
+    assert index.stale() == ["Same", "Same"]
+    assert index.refresh() == 2
+    assert {m.host for m in index.search("other.org")} == {"other.org", "mail.other.org"}